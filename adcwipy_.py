@@ -16,7 +16,6 @@ def adc_wipy(shed: RST2PyI) -> None:
     shed.module(
         name="machine.ADCWiPy",
         old="class ADCWiPy -- analog to digital conversion",
-        post_doc="from typing import overload",
         end="Usage::",
     )
     constructors: Final = "Constructors"
@@ -22,8 +22,6 @@ def array(shed: RST2PyI) -> None:
         name="array",
         old="efficient arrays of numeric data",
         post_doc="""
-from typing import overload, Sequence, Any, MutableSequence, Generic, Text, TypeVar, Final
-
 _T: Final = TypeVar("_T", int, float, Text)
 """,
         end=r"|see_cpython_module| :mod:`python:array`.",
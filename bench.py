@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for the generator, run against a local HTTP server that stands in for GitHub.
+"""
+
+import ast
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from functools import partial
+from hashlib import sha256
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from threading import Thread
+from typing import Iterator, List, Tuple, Any, Dict
+
+import rst
+from fetch import prefetch, toctree_entries, ConnectionPool
+from class_ import Class
+from pyi import PYI
+from rst import fetch_url, RST
+from rst2pyi import RST2PyI
+import validate
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+
+class _DocsHandler(SimpleHTTPRequestHandler):
+    """
+    Serves a `docs/library` directory, sleeping for `latency` seconds before each response to simulate the network.
+    Connections are kept alive (HTTP/1.1) and if `compress` files are sent gzipped to clients that accept gzip.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency: float = 0.0
+    compress: bool = False
+
+    def do_GET(self) -> None:
+        time.sleep(self.latency)
+        if not self.compress or "gzip" not in self.headers.get("Accept-Encoding", ""):
+            super().do_GET()
+            return
+        try:
+            with open(self.translate_path(self.path), "rb") as f:
+                body = gzip.compress(f.read())
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # Quiet.
+
+
+@contextmanager
+def serve(
+    directory: str, *, latency: float = 0.0, compress: bool = False
+) -> Iterator[str]:
+    """
+    Serve `directory` on a free local port for the duration of the `with` block; yields the base URL.
+    """
+    handler = type(
+        "_LatencyDocsHandler",
+        (_DocsHandler,),
+        {"latency": latency, "compress": compress},
+    )
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(handler, directory=directory)
+    )
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def synthetic_docs(
+    directory: str, *, num_modules: int = 40, num_classes: int = 1, num_lines: int = 500
+) -> List[str]:
+    """
+    Write `num_modules` module `.rst` files, each with a toctree of `num_classes` class files, to `directory`.
+    Returns the module names.
+    """
+    names = [f"mod{m}" for m in range(num_modules)]
+    body = "".join(f"   Line {i} of the description.\n" for i in range(num_lines))
+    for name in names:
+        classes = [f"{name}.Class{c}.rst" for c in range(num_classes)]
+        toctree = "".join(f"   {class_}\n" for class_ in classes)
+        with open(os.path.join(directory, name + ".rst"), "w") as f:
+            f.write(f"{name}\n{'=' * len(name)}\n\n{body}\n.. toctree::\n\n{toctree}")
+        for class_ in classes:
+            with open(os.path.join(directory, class_), "w") as f:
+                f.write(f"{class_}\n{'=' * len(class_)}\n\n{body}")
+    return names
+
+
+@contextmanager
+def _docs(docs: str) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Yields `docs` and its module names, or if `docs` is empty a temporary synthetic docs directory and its modules.
+    """
+    if docs:
+        from main import _GENERATORS
+
+        yield docs, [generator.name for generator in _GENERATORS]
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory, synthetic_docs(directory)
+
+
+def bench_prefetch(*, docs: str, latency: float, workers: int) -> None:
+    """
+    Compare fetching each file in turn, as `RST.push_url` does by default, with `prefetch`.
+    """
+    with _docs(docs) as (directory, names):
+        with serve(directory, latency=latency) as base_url:
+            seeds = [base_url + name + ".rst" for name in names]
+
+            start = time.perf_counter()
+            serial = 0
+            for url in seeds:
+                content = fetch_url(url)
+                serial += 1
+                for entry in toctree_entries(content.decode()):
+                    fetch_url(base_url + entry)
+                    serial += 1
+            serial_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            contents = prefetch(seeds, max_workers=workers)
+            prefetch_time = time.perf_counter() - start
+
+        print(f"Latency per request: {latency * 1000:.1f} ms")
+        print(f"Serial:   {serial} files in {serial_time:.3f} s")
+        print(
+            f"Prefetch: {len(contents)} files in {prefetch_time:.3f} s "
+            f"({workers} workers, {serial_time / prefetch_time:.1f}x faster)"
+        )
+
+
+def bench_connections(*, docs: str, latency: float, compress: bool) -> None:
+    """
+    Compare a new connection per file, as `urlopen` does, with reusing pooled connections.
+    """
+    with _docs(docs) as (directory, names):
+        with serve(directory, latency=latency, compress=compress) as base_url:
+            seeds = [base_url + name + ".rst" for name in names]
+            urls = sorted(prefetch(seeds))
+            results = []
+            for max_per_host in (0, ConnectionPool.max_per_host):
+                pool = ConnectionPool(max_per_host=max_per_host)
+                start = time.perf_counter()
+                responses = [pool.get(url, {}) for url in urls]
+                results.append((time.perf_counter() - start, responses))
+                pool.close()
+    (new_time, new_responses), (pooled_time, pooled_responses) = results
+    print(
+        f"{'File':<32} {'New connect':>12} {'transfer':>9} "
+        f"{'Pooled connect':>15} {'transfer':>9}"
+    )
+    for url, new, pooled in zip(urls, new_responses, pooled_responses):
+        print(
+            f"{url[len(base_url):]:<32} "
+            f"{new.connect_time * 1000:>9.2f} ms {new.transfer_time * 1000:>6.2f} ms "
+            f"{pooled.connect_time * 1000:>12.2f} ms {pooled.transfer_time * 1000:>6.2f} ms"
+        )
+    new_connect = sum(r.connect_time for r in new_responses)
+    pooled_connect = sum(r.connect_time for r in pooled_responses)
+    print(
+        f"New connection per file: {new_time:.3f} s ({new_connect:.3f} s connecting)"
+    )
+    print(
+        f"Pooled connections:      {pooled_time:.3f} s "
+        f"({pooled_connect:.3f} s connecting)"
+    )
+
+
+def bench_imports(*, module: str, repeats: int) -> None:
+    """
+    Compare the start-up time of importing every generator (eager) with importing just one (lazy),
+    and with importing just `main` and the core modules it needs to parse its arguments (`rst2pyi`, `fetch`, etc.).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    eager = "import main\nfor g in main._GENERATORS: g.load()"
+    lazy = f"import main\nmain._select([{module!r}], [])[0].load()"
+    for name, code in (
+        ("Baseline (python)", "pass"),
+        ("Core (main)", "import main"),
+        ("Eager", eager),
+        ("Lazy", lazy),
+    ):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=here, check=True)
+            times.append(time.perf_counter() - start)
+        print(f"{name + ':':<19} {min(times) * 1000:7.1f} ms (best of {repeats})")
+
+
+class _ListRST:
+    """
+    `RST` as it was, a reversed list of lines that are all decoded on `push_url`, for comparison;
+    hashing the content for `sources` like `RST`, so that only the line stacks differ.
+    """
+
+    def __init__(self) -> None:
+        self._lines: List[str] = []
+        self.sources: Dict[str, str] = {}
+
+    def push_content(self, content: bytes) -> None:
+        self.sources["content"] = sha256(content).hexdigest()
+        for line in reversed(content.splitlines()):
+            self._lines.append(line.decode())
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+        return self._lines.pop()
+
+    def push_line(self, line: str) -> None:
+        self._lines.append(line)
+
+
+def _read_all(rst_: Any, content: bytes) -> None:
+    """
+    Push `content` then read every line, pushing back and re-reading every tenth line like `RST2PyI.is_end`.
+    """
+    if isinstance(rst_, RST):
+        rst_.push_url("content")
+    else:
+        rst_.push_content(content)
+    count = 0
+    for line in iter(lambda: next(rst_, None), None):
+        count += 1
+        if count % 10 == 0:
+            rst_.push_line(line)
+            next(rst_)
+
+
+def bench_rst(*, docs: str, repeats: int) -> None:
+    """
+    Compare the allocations and time of `RST` with the reversed list of lines it used to be.
+    """
+    if docs:
+        with open(os.path.join(docs, "pyb.rst"), "rb") as f:
+            content = f.read()
+    else:
+        content = "".join(
+            f"   Line {i} of a ``pyb.rst`` sized file.\n" for i in range(4000)
+        ).encode()
+    print(f"{len(content.splitlines())} lines, {len(content)} bytes")
+    for name, new in (("List", _ListRST), ("RST", lambda: RST(fetch=lambda _: content))):
+        rst_ = new()
+        blocks = sys.getallocatedblocks()
+        if isinstance(rst_, RST):
+            rst_.push_url("content")
+        else:
+            rst_.push_content(content)
+        blocks = sys.getallocatedblocks() - blocks
+        tracemalloc.start()
+        _read_all(new(), content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            _read_all(new(), content)
+        seconds = (time.perf_counter() - start) / repeats
+        print(
+            f"{name + ':':<5} {blocks:6} blocks allocated by push, "
+            f"{peak / 1024:7.1f} KiB peak, {seconds * 1000:6.2f} ms per read"
+        )
+
+
+def _synthetic_pyi(*, classes: int, defs: int) -> PYI:
+    """
+    A `pyb.pyi` sized `PYI` (by default), each def having a few lines of documentation.
+    """
+    pyi = PYI(doc=["Synthetic module.", ""], imports_vars_defs=["from typing import Final"])
+    for c in range(classes):
+        class_ = Class(class_def=f"class Class{c}:", doc=[f"   Class {c}."])
+        for d in range(defs):
+            class_.defs.append(
+                f"""
+   def method{d}(self, arg: int, /) -> None:
+      \"\"\"
+      Method {d} of class {c}, which does something with `arg`
+      and has a second line of documentation that is fairly long, like many do.
+      \"\"\"
+"""
+            )
+        pyi.classes.append(class_)
+    return pyi
+
+
+def bench_render(*, classes: int, defs: int) -> None:
+    """
+    Compare the peak memory and time of writing a `.pyi` file as one string with streaming it.
+    """
+    pyi = _synthetic_pyi(classes=classes, defs=defs)
+    size = len(str(pyi))
+    print(f"{size / 1024:.1f} KiB of `.pyi`")
+    writers = (
+        ("String", lambda f: f.write(str(pyi))),
+        ("Stream", pyi.write_to),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pyb.pyi")
+        for name, write in writers:
+            tracemalloc.start()
+            with open(path, "w") as f:
+                write(f)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            start = time.perf_counter()
+            with open(path, "w") as f:
+                write(f)
+            seconds = time.perf_counter() - start
+            print(
+                f"{name + ':':<7} {peak / 1024:7.1f} KiB peak, {seconds * 1000:6.2f} ms"
+            )
+
+
+def _stub_set(stubs: str, directory: str, u_mode: str) -> List[str]:
+    """
+    Copy the stub set `stubs`, or if empty write a synthetic set of 20 modules with `u` aliases,
+    to `directory` with the `u` aliases written as `u_mode`; returns the stub file names.
+    """
+    shed = RST2PyI(output_root_dir=directory, u_mode=u_mode)
+    if stubs:
+        names = sorted(name for name in os.listdir(stubs) if name.endswith(".pyi"))
+        for name in names:
+            if not (name.startswith("u") and name[1:] in names):
+                shutil.copyfile(
+                    os.path.join(stubs, name), os.path.join(directory, name)
+                )
+    else:
+        names = []
+        for i in range(20):
+            names += [f"module{i}.pyi", f"umodule{i}.pyi"]
+            with open(os.path.join(directory, f"module{i}.pyi"), "w") as f:
+                _synthetic_pyi(classes=5, defs=40).write_to(f)
+    for name in names:
+        if name.startswith("u") and name[1:] in names:
+            if u_mode == "copy":
+                shutil.copyfile(
+                    os.path.join(directory, name[1:]), os.path.join(directory, name)
+                )
+            else:
+                shed.write_u_alias(name[1 : -len(".pyi")])
+    return names
+
+
+def bench_aliases(*, stubs: str, repeats: int) -> None:
+    """
+    Compare the size and parse time (`ast.parse` and, if installed, mypy) of the stubs for each `--u-mode`.
+    """
+    try:
+        import mypy  # noqa: F401
+    except ImportError:
+        mypy = None
+        print("mypy not installed, only timing `ast.parse`.")
+    for u_mode in RST2PyI.U_MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            names = _stub_set(stubs, directory, u_mode)
+            paths = [os.path.join(directory, name) for name in names]
+            size = sum(os.lstat(path).st_size for path in paths)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for path in paths:
+                    with open(path) as f:
+                        ast.parse(f.read(), path)
+            parse = (time.perf_counter() - start) / repeats
+            line = (
+                f"{u_mode + ':':<9} {size / 1024:8.1f} KiB, "
+                f"ast.parse {parse * 1000:7.1f} ms"
+            )
+            if mypy is not None:
+                start = time.perf_counter()
+                errors = validate._mypy(directory, names)  # As `--validate mypy` does.
+                line += (
+                    f", mypy {time.perf_counter() - start:6.2f} s "
+                    f"({len(errors)} errors)"
+                )
+            print(line)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "--docs",
+        default="",
+        help="a local `docs/library` directory to serve (default a synthetic one)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="seconds of latency added to each request (default 0.05)",
+    )
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    prefetch_parser = subparsers.add_parser(
+        "prefetch", help=bench_prefetch.__doc__.strip()
+    )
+    prefetch_parser.add_argument("--workers", type=int, default=8)
+    connections_parser = subparsers.add_parser(
+        "connections", help=bench_connections.__doc__.strip()
+    )
+    connections_parser.add_argument(
+        "--gzip", action="store_true", help="serve the files gzipped"
+    )
+    imports_parser = subparsers.add_parser(
+        "imports", help=bench_imports.__doc__.strip()
+    )
+    imports_parser.add_argument(
+        "--module", default="machine", help="the lazily imported module"
+    )
+    imports_parser.add_argument("--repeats", type=int, default=10)
+    rst_parser = subparsers.add_parser("rst", help=bench_rst.__doc__.strip())
+    rst_parser.add_argument("--repeats", type=int, default=20)
+    render_parser = subparsers.add_parser(
+        "render", help=bench_render.__doc__.strip()
+    )
+    render_parser.add_argument("--classes", type=int, default=30)
+    render_parser.add_argument("--defs", type=int, default=40)
+    aliases_parser = subparsers.add_parser(
+        "aliases", help=bench_aliases.__doc__.strip()
+    )
+    aliases_parser.add_argument(
+        "--stubs",
+        default="",
+        help="a directory of stubs generated with `--u-mode copy` (default a synthetic one)",
+    )
+    aliases_parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    if args.benchmark == "prefetch":
+        bench_prefetch(docs=args.docs, latency=args.latency, workers=args.workers)
+    elif args.benchmark == "connections":
+        bench_connections(docs=args.docs, latency=args.latency, compress=args.gzip)
+    elif args.benchmark == "imports":
+        bench_imports(module=args.module, repeats=args.repeats)
+    elif args.benchmark == "rst":
+        bench_rst(docs=args.docs, repeats=args.repeats)
+    elif args.benchmark == "render":
+        bench_render(classes=args.classes, defs=args.defs)
+    elif args.benchmark == "aliases":
+        bench_aliases(stubs=args.stubs, repeats=args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,11 +15,6 @@ def bluetooth(shed: RST2PyI) -> None:
     shed.module(
         name="bluetooth",
         old="Low-level Bluetooth radio functionality",
-        post_doc=f"""
-from typing import overload, Any, Callable, Final
-
-from uio import AnyReadableBuf, AnyWritableBuf
-""",
         end="class BLE",
     )
     shed.class_(
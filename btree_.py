@@ -13,8 +13,6 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
 
 def btree(shed: RST2PyI) -> None:
     module_post_doc = f"""
-from typing import Any, Final, Iterable
-
 from uio import IOBase
 
 """
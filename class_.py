@@ -9,9 +9,10 @@ Note:
 """
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Iterator
 
 import rst
+from timing import timed
 
 __author__ = rst.__author__
 __copyright_ = rst.__copyright__
@@ -33,6 +34,27 @@ def strip_leading_and_trailing_blank_lines(lines: List[str]) -> List[str]:
     return lines[start:end]
 
 
+def joined_chunks(lines: List[str], *, strip_new_lines: bool = False) -> Iterator[str]:
+    """
+    The chunks of `'\\n'.join(strip_leading_and_trailing_blank_lines(lines))`, without joining them,
+    and if `strip_new_lines` `.strip('\\n')`ed.
+    """
+    lines = strip_leading_and_trailing_blank_lines(lines)
+    if not lines:
+        return
+    last = len(lines) - 1
+    for index, line in enumerate(lines):
+        if strip_new_lines:
+            # Only the first and last lines can have new lines stripped, since they aren't blank.
+            if index == 0:
+                line = line.lstrip("\n")
+            if index == last:
+                line = line.rstrip("\n")
+        if index:
+            yield "\n"
+        yield line
+
+
 @dataclass
 class Class:
     pre_str: str = ""
@@ -40,23 +62,26 @@ class Class:
     doc: List[str] = field(default_factory=list)
     imports_vars: List[str] = field(default_factory=list)
     defs: List[str] = field(default_factory=list)
+    source: str = ""  # The `.rst` file, if the class has its own (see `RST2PyI.class_from_file`); not rendered.
 
+    @timed("render")
     def __str__(self) -> str:
+        return "".join(self.iter_chunks())
+
+    def iter_chunks(self) -> Iterator[str]:
+        """
+        The text of the class in chunks, for streaming rather than building one string, see `PYI.write_to`.
+        """
         assert self.class_def, f"No class definition string! {self.class_def}"
         if self.pre_str and not self.pre_str.endswith("\n"):
             self.pre_str += (
                 "\n"  # Terminate with a return non-empty, non-terminated pre strings.
             )
-        new_line = "\n"  # Can't have `\` inside `{}` in an f-string!
-        return f'''
-{(self.pre_str + self.class_def).strip()}
-   """
-{new_line.join(strip_leading_and_trailing_blank_lines(self.doc)).strip(new_line)}
-   """
-
-{new_line.join(strip_leading_and_trailing_blank_lines(self.imports_vars)).strip(new_line)}
-
-{new_line.join(strip_leading_and_trailing_blank_lines(self.defs))}
-'''.lstrip(
-            new_line
-        )
+        yield (self.pre_str + self.class_def).strip()
+        yield '\n   """\n'
+        yield from joined_chunks(self.doc, strip_new_lines=True)
+        yield '\n   """\n\n'
+        yield from joined_chunks(self.imports_vars, strip_new_lines=True)
+        yield "\n\n"
+        yield from joined_chunks(self.defs)
+        yield "\n"
@@ -16,8 +16,6 @@ def cmath(shed: RST2PyI) -> None:
         name="cmath",
         old="mathematical functions for complex numbers",
         post_doc="""
-from typing import SupportsComplex, SupportsFloat, Final
-
 _C: Final = SupportsFloat | SupportsComplex
 """,
         end="Functions",
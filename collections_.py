@@ -16,8 +16,6 @@ def collections(shed: RST2PyI) -> None:
         name="collections",
         old="collection and container types",
         post_doc=f"""
-from typing import overload, Any, Type, Iterable, TypeVar, Generic, Mapping, Dict, Final
-
 _KT: Final = TypeVar("_KT")
 _VT: Final = TypeVar("_VT")
 """,
@@ -0,0 +1,188 @@
+"""
+Opt-in counting of the work done by the parsing primitives, per generator function, e.g. `pyb_._uart`,
+to find which generators make the parse slow; unlike `timing` it counts the work rather than timing it.
+
+The counts, `COUNTS`, are:
+
+  1. `popped`: lines read from `RST`, `RST.__next__`; including `pop_line` and `peek`.
+  2. `pushed_back`: lines pushed back onto `RST`, `RST.push_line` and `RST.push_lines`.
+  3. `consumes`: calls of `RST2PyI.consume_line`, which all the `consume_*` methods use.
+  4. `skipped`: lines read, and discarded, by `consume_*(..., and_preceding_lines=True)`;
+    and `max_skipped` the most in any one call.
+  5. `is_end`: evaluations of `RST2PyI.is_end`.
+  6. `decoded_bytes`: bytes of `.rst` files decoded, `RST.push_url`.
+
+The counts are attributed to the function, outside the `RST2PyI` and `RST` code, that called the declaration or
+`consume_*` method doing the work (`counted`); work done directly on `shed.rst`, e.g. `pop_line`,
+is attributed to the last such function.
+
+Counting is enabled by `enable`; when disabled (the default) the cost is a test per line read.
+The hot paths in `rst.py` count into `rst.counts`, the counts of the current function, directly.
+"""
+
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict, Tuple, List, Optional, Callable, TypeVar, Final, Any
+
+import rst
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+COUNTS: Final[Tuple[str, ...]] = (
+    "popped",
+    "pushed_back",
+    "consumes",
+    "skipped",
+    "max_skipped",
+    "is_end",
+    "decoded_bytes",
+)
+
+_INTERNAL: Final = frozenset(
+    ("rst2pyi.py", "rst.py", "timing.py", "tracing.py", "counting.py")
+)
+"""
+The files whose functions the counts are not attributed to, i.e. the calls skipped when finding the caller.
+"""
+
+_UNATTRIBUTED: Final = "(unattributed)"
+
+
+@dataclass
+class Counters:
+    """
+    The `COUNTS` per caller (`<module>.<function>`), and the `caller` following counts are attributed to.
+    """
+
+    counts: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    caller: str = _UNATTRIBUTED
+
+    def attribute(self, caller: str) -> None:
+        """
+        Attribute following counts to `caller`.
+        """
+        self.caller = caller
+        counts = self.counts.get(caller)
+        if counts is None:
+            counts = self.counts[caller] = dict.fromkeys(COUNTS, 0)
+        rst.counts = counts
+
+    def merge(self, other: "Counters") -> None:
+        for caller, counts in other.counts.items():
+            merged = self.counts.setdefault(caller, dict.fromkeys(COUNTS, 0))
+            for name, count in counts.items():
+                if name == "max_skipped":
+                    merged[name] = max(merged[name], count)
+                else:
+                    merged[name] += count
+
+    def _nonzero(self) -> List[Tuple[str, Dict[str, int]]]:
+        return [item for item in self.counts.items() if any(item[1].values())]
+
+    def table(self, *, top: int = 20) -> str:
+        """
+        The `top` worst offenders, the callers that read the most lines (`popped`), as a table with a total row.
+        """
+        rows = sorted(
+            self._nonzero(),
+            key=lambda item: (item[1]["popped"], item[1]["skipped"]),
+            reverse=True,
+        )
+        totals = dict.fromkeys(COUNTS, 0)
+        for _, counts in rows:
+            for name, count in counts.items():
+                if name == "max_skipped":
+                    totals[name] = max(totals[name], count)
+                else:
+                    totals[name] += count
+        rows = rows[:top]
+        name_width = max(len(caller) for caller, _ in rows + [("Caller", {})])
+        widths = [max(len(name), 8) for name in COUNTS]
+        lines = [
+            f"{'Caller':<{name_width}} "
+            + " ".join(f"{name:>{width}}" for name, width in zip(COUNTS, widths))
+        ]
+        for caller, counts in rows + [("Total", totals)]:
+            lines.append(
+                f"{caller:<{name_width}} "
+                + " ".join(
+                    f"{counts[name]:>{width}}" for name, width in zip(COUNTS, widths)
+                )
+            )
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        records = [
+            {"caller": caller, **counts} for caller, counts in sorted(self._nonzero())
+        ]
+        with open(path, "w") as f:
+            json.dump(records, f, indent=1)
+
+
+counters: Optional[Counters] = None
+"""
+The active `Counters`, if any; set with `enable`.
+"""
+
+
+def enable(active: Optional[Counters]) -> None:
+    """
+    Count into `active`, or if `None` stop counting.
+    """
+    global counters
+    counters = active
+    if active is None:
+        rst.counts = None
+    else:
+        active.attribute(active.caller)
+
+
+def _caller() -> str:
+    """
+    The function, as `<module>.<function>`, outside the `_INTERNAL` files that called the current function.
+    """
+    frame: Any = sys._getframe(1)
+    while (
+        frame is not None and os.path.basename(frame.f_code.co_filename) in _INTERNAL
+    ):
+        frame = frame.f_back
+    if frame is None:
+        return _UNATTRIBUTED
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def counted(function: _F) -> _F:
+    """
+    Decorator that attributes the counts from calls of the decorated function, until the next such call,
+    to its caller (see `_caller`) whilst `counters` is set.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        active = counters
+        if active is not None:
+            active.attribute(_caller())
+        return function(*args, **kwargs)
+
+    return wrapper  # type: ignore
+
+
+def consumed(skipped: int) -> None:
+    """
+    Count a `consume_*` call that `skipped` lines, if counting.
+    """
+    counts = rst.counts
+    if counts is not None:
+        counts["consumes"] += 1
+        counts["skipped"] += skipped
+        if skipped > counts["max_skipped"]:
+            counts["max_skipped"] = skipped
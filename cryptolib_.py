@@ -15,11 +15,6 @@ def cryptolib(shed: RST2PyI) -> None:
     shed.module(
         name="cryptolib",
         old="cryptographic ciphers",
-        post_doc=f"""
-from typing import overload
-
-from uio import AnyReadableBuf, AnyWritableBuf
-""",
         end=r"Classes",
     )
     shed.consume_up_to_but_excl_end_line(end=".. class:: aes")
@@ -15,9 +15,6 @@ def errno(shed: RST2PyI) -> None:
     shed.module(
         name="errno",
         old="system error codes",
-        post_doc=f"""
-from typing import Final, Dict
-""",
         end=r"Constants",
     )
     shed.vars(
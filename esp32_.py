@@ -17,10 +17,7 @@ def esp32(shed: RST2PyI) -> None:
         name="esp32",
         old="functionality specific to the ESP32",
         post_doc="""
-from typing import Final, List, Tuple, overload, ClassVar
-
 from machine import Pin
-from uio import AnyReadableBuf
 from uos import AbstractBlockDev
 """,
         end="Functions",
@@ -17,10 +17,6 @@ def esp(shed: RST2PyI) -> None:
         name="esp",
         old="functions related to the ESP8266 and ESP32",
         post_doc='''
-from typing import Final, overload
-
-from uio import AnyWritableBuf, AnyReadableBuf
-
 SLEEP_NONE: Final[int] = ...
 """All functions enabled."""
 
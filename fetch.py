@@ -0,0 +1,681 @@
+"""
+Alternative ways of fetching the `.rst` documentation files for `RST.push_url` (the default is `rst.fetch_url`).
+
+`prefetch` downloads all the files a run will need up front, concurrently, and `Prefetched` then serves `push_url`
+from the downloaded contents.
+`DiskCache` keeps the files between runs and revalidates them with conditional requests.
+`LocalDocs` reads the files from a local checkout of MicroPython's `docs/library`, i.e. without a network.
+`ConnectionPool` reuses persistent (keep-alive) connections, rather than connecting for each file like `urlopen`.
+`GitHubBlobs` fetches each distinct file once when generating several versions of the docs.
+`GitObjects` reads the files of any version straight from a local clone of MicroPython's git repository.
+"""
+
+import gzip
+import json
+import os
+import re
+import subprocess
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from hashlib import sha256
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from multiprocessing.util import Finalize
+from sys import stderr
+from tempfile import NamedTemporaryFile
+from threading import Lock, Event
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    List,
+    Final,
+    Union,
+    Set,
+    Optional,
+    Callable,
+    Mapping,
+    Any,
+    ClassVar,
+    Tuple,
+)
+from urllib.error import HTTPError
+from urllib.parse import urlsplit, urljoin
+from urllib.request import Request, urlopen
+
+import rst
+from rst import Fetch, fetch_url
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+_toctree_entry: Final = re.compile(r"^[ \t]+([\w.\-]+\.rst)[ \t]*$", re.MULTILINE)
+
+
+def toctree_entries(text: str) -> List[str]:
+    """
+    The file names listed in the `.. toctree::`s of `text`, in order, e.g. `pyb.Pin.rst` from `pyb.rst`.
+    These are the files that `RST2PyI.class_from_file` reads.
+    """
+    return _toctree_entry.findall(text)
+
+
+def prefetch(
+    urls: Iterable[str],
+    *,
+    fetch: Fetch = fetch_url,
+    max_workers: int = 8,
+    follow_toctrees: bool = True,
+) -> Dict[str, bytes]:
+    """
+    Concurrently fetch `urls` using a pool of at most `max_workers` threads.
+    If `follow_toctrees` is true then the files listed in the `.. toctree::`s of the fetched files are also fetched,
+    which discovers the class files (e.g. `pyb.Pin.rst`) from the module files (e.g. `pyb.rst`).
+
+    Failed fetches are left out of the returned dictionary of URL to contents,
+    `Prefetched` will then re-try them when (if) they are needed and it is that fetch that reports the error.
+    """
+    contents: Dict[str, bytes] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        seen: Set[str] = set()
+        pending: Dict[Future, str] = {}
+
+        def submit(url: str) -> None:
+            if url not in seen:
+                seen.add(url)
+                pending[pool.submit(fetch, url)] = url
+
+        for url in urls:
+            submit(url)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                if future.exception() is not None:
+                    continue
+                content = future.result()
+                contents[url] = content
+                if follow_toctrees:
+                    base_url = url[: url.rfind("/") + 1]
+                    for entry in toctree_entries(content.decode()):
+                        submit(base_url + entry)
+    return contents
+
+
+@dataclass(frozen=True)
+class Prefetched:
+    """
+    A `Fetch` that serves the `contents` returned by `prefetch` and uses `fallback` for anything else.
+    """
+
+    contents: Dict[str, bytes]
+    fallback: Fetch = fetch_url
+
+    def __call__(self, url: Union[str, Request]) -> bytes:
+        if isinstance(url, str):
+            content = self.contents.get(url)
+            if content is not None:
+                return content
+        return self.fallback(url)
+
+
+@dataclass(frozen=True)
+class Response:
+    """
+    The parts of an HTTP response that `DiskCache` needs; `status` is either 200 (OK) or 304 (not modified).
+    `ConnectionPool` also reports the seconds spent connecting (0 for a reused connection) and transferring.
+    """
+
+    status: int
+    body: bytes = b""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    connect_time: float = 0.0
+    transfer_time: float = 0.0
+
+
+Get = Callable[[str, Mapping[str, str]], Response]
+"""
+Type of functions that `GET` a URL with the given extra request headers.
+"""
+
+
+def get_url(url: str, headers: Mapping[str, str]) -> Response:
+    """
+    The default `Get` for `DiskCache`; a `urlopen` that returns rather than raises for 304 (not modified).
+    """
+    try:
+        with urlopen(Request(url, headers=dict(headers))) as f:
+            return Response(
+                status=f.status,
+                body=f.read(),
+                etag=f.headers.get("ETag"),
+                last_modified=f.headers.get("Last-Modified"),
+            )
+    except HTTPError as e:
+        if e.code != 304:
+            raise
+        return Response(
+            status=304,
+            etag=e.headers.get("ETag"),
+            last_modified=e.headers.get("Last-Modified"),
+        )
+
+
+@dataclass
+class ConnectionPool:
+    """
+    A `Get` (method `get`) and a `Fetch` (call) that keep up to `max_per_host` idle persistent connections per host
+    for reuse, saving a TCP and TLS handshake per file.
+    Responses are requested with, and decoded from, `gzip` or `deflate` transfer encoding.
+    Redirects are followed and error statuses raise `HTTPError`, like `urlopen`.
+    `close` the pool when finished with it.
+    """
+
+    max_per_host: int = 8
+    timeout: float = 60.0
+    _idle: Dict[Tuple[str, str], List[HTTPConnection]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    _max_redirects: ClassVar[int] = 5
+    _redirects: ClassVar[Set[int]] = {301, 302, 303, 307, 308}
+
+    def __call__(self, url: Union[str, Request]) -> bytes:
+        if not isinstance(url, str):
+            return fetch_url(url)  # Requests have their own handling, so use `urlopen`.
+        return self.get(url, {}).body
+
+    def get(self, url: str, headers: Mapping[str, str]) -> Response:
+        for _ in range(self._max_redirects):
+            response, location = self._get(url, headers)
+            if location is None:
+                return response
+            url = urljoin(url, location)
+        assert False, f"More than {self._max_redirects} redirects for `{url}`!"
+
+    def _get(
+        self, url: str, headers: Mapping[str, str]
+    ) -> Tuple[Response, Optional[str]]:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path + ("?" + parts.query if parts.query else "")
+        request_headers = {"Accept-Encoding": "gzip, deflate", **headers}
+        connection, connect_time = self._acquire(key)
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=request_headers)
+            response = connection.getresponse()
+        except (HTTPException, OSError):
+            connection.close()
+            if connect_time:
+                raise  # A new connection failed, so give up.
+            # The server closed an idle connection; retry once on a new connection.
+            connection, connect_time = self._acquire(key, reuse=False)
+            start = time.perf_counter()
+            connection.request("GET", path, headers=request_headers)
+            response = connection.getresponse()
+        body = response.read()
+        transfer_time = time.perf_counter() - start
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+        if response.status in self._redirects:
+            return Response(status=response.status), response.headers["Location"]
+        if response.status >= 400:
+            raise HTTPError(
+                url, response.status, response.reason, response.headers, None
+            )
+        encoding = response.headers.get("Content-Encoding", "").strip().lower()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:  # Some servers send a raw deflate stream without a zlib header.
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        return (
+            Response(
+                status=response.status,
+                body=body,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                connect_time=connect_time,
+                transfer_time=transfer_time,
+            ),
+            None,
+        )
+
+    def _acquire(
+        self, key: Tuple[str, str], *, reuse: bool = True
+    ) -> Tuple[HTTPConnection, float]:
+        """
+        An idle connection to `key` (`connect_time` 0) if there is one and `reuse`, else a new one.
+        """
+        if reuse:
+            with self._lock:
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop(), 0.0
+        scheme, netloc = key
+        assert scheme in ("http", "https"), f"Unsupported URL scheme `{scheme}`!"
+        connection_type = HTTPSConnection if scheme == "https" else HTTPConnection
+        connection = connection_type(netloc, timeout=self.timeout)
+        start = time.perf_counter()
+        connection.connect()
+        return connection, time.perf_counter() - start
+
+    def _release(self, key: Tuple[str, str], connection: HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Send to worker processes without the lock and the connections.
+        return {"max_per_host": self.max_per_host, "timeout": self.timeout}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for connection in idle:
+                    connection.close()
+            self._idle.clear()
+
+
+@dataclass
+class GitHubBlobs:
+    """
+    A `Fetch` of the `.rst` files of several versions of MicroPython's docs that fetches each distinct file once;
+    the URLs are `base_url_format` formatted with the version (a tag, branch, or commit) followed by the file name,
+    see `RST2PyI.versioned_base_url`.
+
+    The git blob (content hash) of each of a version's files is looked up in GitHub's listing of the version's
+    `docs/library` directory, `tree_url_format` (one request per version), and a file whose blob has already been
+    fetched, for any version, is served from memory; only new or changed files are fetched, via `fetch`.
+    If a version's listing can't be fetched, e.g. GitHub's rate limit, its files are fetched by URL.
+    """
+
+    base_url_format: str
+    fetch: Fetch = fetch_url
+    tree_url_format: str = "https://api.github.com/repos/micropython/micropython/git/trees/{version}:docs/library"
+    _blobs: Dict[str, Optional[Dict[str, str]]] = field(
+        default_factory=dict, init=False, repr=False
+    )  # Version to file name to blob, `None` if the listing failed.
+    _contents: Dict[str, bytes] = field(default_factory=dict, init=False, repr=False)
+    _fetching: Dict[str, Event] = field(default_factory=dict, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __call__(self, url: Union[str, Request]) -> bytes:
+        blob = self._blob(url) if isinstance(url, str) else None
+        if blob is None:
+            return self.fetch(url)
+        while True:
+            with self._lock:
+                content = self._contents.get(blob)
+                if content is not None:
+                    return content
+                fetching = self._fetching.get(blob)
+                if fetching is None:
+                    fetching = self._fetching[blob] = Event()
+                    break
+            fetching.wait()  # Fetched by another thread, or failed and then retried by this one.
+        try:
+            content = self.fetch(url)
+            with self._lock:
+                self._contents[blob] = content
+            return content
+        finally:
+            with self._lock:
+                del self._fetching[blob]
+            fetching.set()
+
+    def _blob(self, url: str) -> Optional[str]:
+        """
+        The blob of `url`, if known.
+        """
+        prefix, suffix = self.base_url_format.split("{version}")
+        if not url.startswith(prefix) or suffix not in url[len(prefix) :]:
+            return None
+        version, file_name = url[len(prefix) :].split(suffix, 1)
+        with self._lock:
+            known = version in self._blobs
+            blobs = self._blobs.get(version)
+        if not known:
+            blobs = self._list(version)
+            with self._lock:
+                self._blobs[version] = blobs
+        return None if blobs is None else blobs.get(file_name)
+
+    def _list(self, version: str) -> Optional[Dict[str, str]]:
+        try:
+            request = Request(
+                self.tree_url_format.format(version=version),
+                headers={  # GitHub's API requires a user agent.
+                    "Accept": "application/vnd.github+json",
+                    "User-Agent": "PyBoardTypeshedGenerator",
+                },
+            )
+            listing = json.loads(self.fetch(request))
+            return {
+                entry["path"]: entry["sha"]
+                for entry in listing["tree"]
+                if entry["type"] == "blob"
+            }
+        except Exception:  # E.g. rate limited or offline, fall back to fetching by URL.
+            return None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Send to worker processes without the lock, but with the listings and contents so far.
+        return {
+            "base_url_format": self.base_url_format,
+            "fetch": self.fetch,
+            "tree_url_format": self.tree_url_format,
+            "_blobs": self._blobs,
+            "_contents": self._contents,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        blobs = state.pop("_blobs")
+        contents = state.pop("_contents")
+        self.__init__(**state)
+        self._blobs.update(blobs)
+        self._contents.update(contents)
+
+
+@dataclass
+class DiskCache:
+    """
+    A `Fetch` that keeps the fetched files in `directory`.
+
+    A cached file is used as is for `max_age` seconds after it was last fetched or validated,
+    after that it is revalidated with a conditional request using the stored `ETag`/`Last-Modified` headers;
+    if revalidating fails, e.g. offline, the cached file is used (with a warning).
+    An entry with unreadable or incomplete metadata is fetched again.
+    When the cached files total more than `max_bytes` the least recently used are evicted.
+
+    Each file is stored as `<sha256 of url>.rst` with its metadata in `<sha256 of url>.json`;
+    the modification time of the `.rst` file is its last use (for eviction).
+    """
+
+    directory: str
+    max_bytes: int = 64 * 1024 * 1024
+    max_age: float = 24 * 60 * 60
+    get: Get = get_url
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    _data_suffix: ClassVar[str] = ".rst"
+    _meta_suffix: ClassVar[str] = ".json"
+    _meta_keys: ClassVar[Tuple[str, ...]] = ("validated", "etag", "last_modified")
+
+    def __post_init__(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Send to worker processes without the lock (which each process has its own of).
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def __call__(self, url: Union[str, Request]) -> bytes:
+        if not isinstance(url, str):
+            return fetch_url(url)  # Requests have their own headers, so don't cache.
+        key = sha256(url.encode()).hexdigest()
+        data_path = os.path.join(self.directory, key + self._data_suffix)
+        meta_path = os.path.join(self.directory, key + self._meta_suffix)
+        meta = self._read_meta(meta_path)
+        if meta is not None and os.path.exists(data_path):
+            try:
+                if time.time() - meta["validated"] < self.max_age:
+                    return self._use(data_path)
+                headers = {}
+                if meta["etag"] is not None:
+                    headers["If-None-Match"] = meta["etag"]
+                if meta["last_modified"] is not None:
+                    headers["If-Modified-Since"] = meta["last_modified"]
+                try:
+                    response = self.get(url, headers)
+                except (OSError, HTTPException) as e:  # E.g. offline, or a server error.
+                    print(
+                        f"Warning: revalidating `{url}` failed, using the cached copy: {e}",
+                        file=stderr,
+                    )
+                    return self._use(data_path)
+                if response.status == 304:
+                    meta["validated"] = time.time()
+                    self._write_atomically(meta_path, json.dumps(meta).encode())
+                    return self._use(data_path)
+            except FileNotFoundError:  # Evicted whilst in use; fetch again.
+                response = self.get(url, {})
+        else:
+            response = self.get(url, {})
+        self._store(url, data_path, meta_path, response)
+        return response.body
+
+    @staticmethod
+    def _read_meta(meta_path: str) -> Optional[Dict[str, Any]]:
+        """
+        The metadata in `meta_path`, or `None` if missing, unreadable, or incomplete (i.e. corrupt).
+        """
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(meta, dict)
+            or any(key not in meta for key in DiskCache._meta_keys)
+            or not isinstance(meta["validated"], (int, float))
+        ):
+            return None
+        return meta
+
+    @staticmethod
+    def _use(data_path: str) -> bytes:
+        with open(data_path, "rb") as f:
+            content = f.read()
+        os.utime(data_path)  # Record use for LRU eviction.
+        return content
+
+    def _write_atomically(self, path: str, content: bytes) -> None:
+        with NamedTemporaryFile(dir=self.directory, delete=False) as f:
+            f.write(content)
+        os.replace(f.name, path)
+
+    def _store(
+        self, url: str, data_path: str, meta_path: str, response: Response
+    ) -> None:
+        meta = {
+            "url": url,
+            "etag": response.etag,
+            "last_modified": response.last_modified,
+            "validated": time.time(),
+        }
+        with self._lock:
+            self._write_atomically(data_path, response.body)
+            self._write_atomically(meta_path, json.dumps(meta).encode())
+            self._evict(keep=data_path)
+
+    def _evict(self, *, keep: str) -> None:
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self._data_suffix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()  # Least recently used first.
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            meta_path = path[: -len(self._data_suffix)] + self._meta_suffix
+            for evict_path in (path, meta_path):
+                try:
+                    os.remove(evict_path)
+                except FileNotFoundError:
+                    pass  # Another process evicted it.
+            total -= size
+
+
+@dataclass(frozen=True)
+class LocalDocs:
+    """
+    A `Fetch` that reads URLs starting with `base_url` from the corresponding file in `directory`,
+    e.g. `directory` is a local checkout of MicroPython's `docs/library` and `base_url` is `RST2PyI._input_base_url`.
+    Since the URLs are unchanged the generated typesheds are identical to those from fetching the URLs.
+    """
+
+    directory: str
+    base_url: str
+
+    def __call__(self, url: Union[str, Request]) -> bytes:
+        assert isinstance(url, str), f"Can only read `str` URLs locally, got `{url}`!"
+        assert url.startswith(
+            self.base_url
+        ), f"`{url}` does not start with `{self.base_url}`!"
+        path = os.path.join(self.directory, url[len(self.base_url) :])
+        with open(path, "rb") as f:
+            return f.read()
+
+
+@dataclass
+class GitObjects:
+    """
+    A `Fetch` that reads the `.rst` files of any version of MicroPython's docs from the git object database of
+    `repository`, a local clone of MicroPython, without checking anything out;
+    the URLs are `base_url_format` formatted with the version (a tag, branch, or commit) followed by the file name,
+    see `RST2PyI.versioned_base_url`, and are read from `<version>:docs/library/<file name>`.
+
+    The blob (content hash) of each of a version's files is looked up in the version's listing of `docs/library`,
+    `git ls-tree` (one per version), and a file whose blob has already been read, for any version, is served from
+    memory; only new or changed files are read, all via one long lived `git cat-file --batch` process,
+    i.e. over one pipe, rather than a `git show` process per file.
+    A missing file, or version, raises `FileNotFoundError`.
+    `close` when finished with; a worker process's copy is closed when the worker exits.
+    """
+
+    repository: str
+    base_url_format: str
+    path: str = "docs/library"
+    _process: Optional["subprocess.Popen[bytes]"] = field(
+        default=None, init=False, repr=False
+    )
+    _blobs: Dict[str, Dict[str, str]] = field(
+        default_factory=dict, init=False, repr=False
+    )  # Version to file name to blob.
+    _contents: Dict[str, bytes] = field(default_factory=dict, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __call__(self, url: Union[str, Request]) -> bytes:
+        assert isinstance(url, str), f"Can only read `str` URLs from git, got `{url}`!"
+        prefix, suffix = self.base_url_format.split("{version}")
+        assert url.startswith(prefix) and suffix in url[len(prefix) :], (
+            f"`{url}` is not of the form `{self.base_url_format}<file name>`!"
+        )
+        version, file_name = url[len(prefix) :].split(suffix, 1)
+        with self._lock:
+            blobs = self._blobs.get(version)
+            if blobs is None:
+                blobs = self._blobs[version] = self._list(version)
+            blob = blobs.get(file_name)
+            if blob is None:
+                raise FileNotFoundError(
+                    f"`{version}:{self.path}/{file_name}` not in `{self.repository}`!"
+                )
+            content = self._contents.get(blob)
+            if content is None:
+                content = self._contents[blob] = self._read(blob)
+            return content
+
+    def _list(self, version: str) -> Dict[str, str]:
+        """
+        The blob of each file in `version`'s `path`.
+        """
+        listing = subprocess.run(
+            ["git", "-C", self.repository, "ls-tree", "-z", f"{version}:{self.path}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        if listing.returncode != 0:
+            raise FileNotFoundError(
+                f"`{version}:{self.path}` not in `{self.repository}`: "
+                f"{listing.stderr.decode().strip()}"
+            )
+        blobs: Dict[str, str] = {}
+        for entry in listing.stdout.decode().split("\0"):
+            if entry:
+                info, file_name = entry.split("\t", 1)
+                _, kind, blob = info.split()
+                if kind == "blob":
+                    blobs[file_name] = blob
+        return blobs
+
+    def _read(self, blob: str) -> bytes:
+        """
+        The contents of `blob`; must hold `_lock`.
+        """
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "-C", self.repository, "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+            # Also run at the exit of a worker process, which doesn't run `atexit` functions.
+            Finalize(self, GitObjects._stop, args=(self._process,), exitpriority=0)
+        stdin: IO[bytes] = self._process.stdin  # type: ignore
+        stdout: IO[bytes] = self._process.stdout  # type: ignore
+        stdin.write(blob.encode() + b"\n")
+        stdin.flush()
+        header = stdout.readline().decode()
+        parts = header.split()
+        assert (
+            len(parts) == 3
+        ), f"Can't read blob `{blob}` from `{self.repository}`: {header.strip()}"
+        _, kind, size = parts
+        content = stdout.read(int(size))
+        stdout.read(1)  # The `\n` after the contents.
+        assert kind == "blob", f"`{blob}` is a {kind}, not a file!"
+        return content
+
+    @staticmethod
+    def _stop(process: "subprocess.Popen[bytes]") -> None:
+        process.stdin.close()  # type: ignore
+        process.wait()
+
+    def close(self) -> None:
+        with self._lock:
+            process = self._process
+            self._process = None
+        if process is not None:
+            GitObjects._stop(process)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Send to worker processes without the lock and the `git` process, each worker starts its own,
+        # but with the listings so far.
+        return {
+            "repository": self.repository,
+            "base_url_format": self.base_url_format,
+            "path": self.path,
+            "_blobs": self._blobs,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        blobs = state.pop("_blobs")
+        self.__init__(**state)
+        self._blobs.update(blobs)
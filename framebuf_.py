@@ -15,11 +15,6 @@ def framebuf(shed: RST2PyI) -> None:
     shed.module(
         name="framebuf",
         old="Frame buffer manipulation",
-        post_doc=f"""
-from typing import overload, Final
-
-from uio import AnyWritableBuf
-""",
         end="class FrameBuffer",
     )
     shed.consume_minuses_underline_line(and_preceding_lines=True)
@@ -15,7 +15,6 @@ def gc(shed: RST2PyI) -> None:
     shed.module(
         name="gc",
         old="control the garbage collector",
-        post_doc="from typing import overload",
         end="Functions",
     )
     shed.def_(
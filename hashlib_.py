@@ -15,12 +15,6 @@ def hashlib(shed: RST2PyI) -> None:
     shed.module(
         name="hashlib",
         old="hashing algorithms",
-        post_doc=f"""
-from abc import ABC
-from typing import overload
-
-from uio import AnyReadableBuf
-""",
         end="Constructors",
     )
     shed.consume_minuses_underline_line(and_preceding_lines=True)
@@ -16,8 +16,6 @@ def heapq(shed: RST2PyI) -> None:
         name="heapq",
         old="heap queue algorithm",
         post_doc="""
-from typing import TypeVar, Any, Final
-
 _T: Final = TypeVar("_T")
 """,
         end="Functions",
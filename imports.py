@@ -0,0 +1,377 @@
+"""
+Automatic, minimal, imports for the typesheds, see `RST2PyI.write`:
+a typeshed imports only the names it uses, from `PROVIDERS`, that it neither defines nor imports itself;
+so generators needn't paste, e.g., `from typing import ...` into their `post_doc`s.
+
+The aliases many typesheds share, e.g. `AnyReadableBuf`, are defined once, in private typeshed `_aliases.pyi`
+(`aliases_pyi`), rather than in `io.pyi`, so that using them doesn't import `io.pyi`
+(`io.pyi` re-exports them, since they are part of its public interface).
+"""
+
+import ast
+import re
+from typing import Dict, Final, Iterator, List, Set, Tuple
+
+import rst
+from pyi import PYI
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+ALIASES: Final = "_aliases"
+"""
+The name of the private module of shared aliases.
+"""
+
+_ALIASES_DEFS: Final = '''
+AnyStr_co: Final = TypeVar("AnyStr_co", str, bytes, covariant=True)
+
+@runtime_checkable
+class PathLike(Protocol[AnyStr_co]):
+    def __fspath__(self) -> AnyStr_co:
+        ...
+
+StrOrBytesPath: Final = str | bytes | PathLike[str] | PathLike[bytes]
+_OpenFile: Final = StrOrBytesPath | int
+
+AnyReadableBuf: Final = TypeVar('AnyReadableBuf', bytearray, array, memoryview, bytes)
+"""
+Type that allows bytearray, array, memoryview, or bytes,
+but only one of these and not a mixture in a single declaration.
+"""
+
+AnyWritableBuf: Final = TypeVar('AnyWritableBuf', bytearray, array, memoryview)
+"""
+Type that allows bytearray, array, or memoryview, but only one of these and not a mixture in a single declaration.
+"""
+'''
+
+_PROVIDED: Final[Dict[str, Tuple[str, ...]]] = {
+    "abc": ("ABC", "abstractmethod"),
+    "types": ("TracebackType",),
+    "typing": (
+        "Any",
+        "AnyStr",
+        "Awaitable",
+        "Callable",
+        "ClassVar",
+        "Coroutine",
+        "Dict",
+        "Final",
+        "Generator",
+        "Generic",
+        "Iterable",
+        "Iterator",
+        "List",
+        "Literal",
+        "Mapping",
+        "MutableSequence",
+        "NoReturn",
+        "Optional",
+        "Protocol",
+        "Sequence",
+        "SupportsComplex",
+        "SupportsFloat",
+        "SupportsInt",
+        "Text",
+        "Tuple",
+        "Type",
+        "TypeVar",
+        "Union",
+        "overload",
+        "runtime_checkable",
+    ),
+    "uarray": ("array",),
+    ALIASES: (
+        "AnyStr_co",
+        "PathLike",
+        "StrOrBytesPath",
+        "_OpenFile",
+        "AnyReadableBuf",
+        "AnyWritableBuf",
+    ),
+}
+"""
+The names imported automatically, by module, in the order the modules are imported.
+"""
+
+PROVIDERS: Final[Dict[str, str]] = {
+    name: module for module, names in _PROVIDED.items() for name in names
+}
+"""
+The module each name imported automatically is imported from.
+"""
+
+
+def aliases_pyi() -> PYI:
+    """
+    The typeshed of the private module of shared aliases, `ALIASES`.
+    """
+    pyi = PYI(
+        doc=["Type aliases shared by the MicroPython typesheds; private, see `io`."],
+        imports_vars_defs=[
+            f"""
+__author__ = "{rst.__author__}"
+__copyright__ = "{rst.__copyright__}"
+__license__ = "{rst.__license__}"
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+""".strip(),
+            _ALIASES_DEFS.rstrip(),
+            "\n",
+        ],
+    )
+    add_imports(pyi)
+    return pyi
+
+
+def defined_names(tree: ast.Module) -> List[str]:
+    """
+    The names defined at the top level of `tree`, other than by imports.
+    """
+    names = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, ast.Assign):
+            names += [t.id for t in node.targets if isinstance(t, ast.Name)]
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.append(node.target.id)
+    return names
+
+
+def _annotations(tree: ast.AST) -> Iterator[ast.expr]:
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args
+            for arg in (
+                arguments.posonlyargs
+                + arguments.args
+                + arguments.kwonlyargs
+                + [arguments.vararg, arguments.kwarg]
+            ):
+                if arg is not None and arg.annotation is not None:
+                    yield arg.annotation
+            if node.returns is not None:
+                yield node.returns
+        elif isinstance(node, ast.AnnAssign):
+            yield node.annotation
+        elif isinstance(node, ast.ClassDef):
+            yield from node.bases
+
+
+def used_names(tree: ast.AST) -> Set[str]:
+    """
+    The names used in `tree`, including in forward references, e.g. `-> "TimerChannel"`
+    or `: "Sequence[Pin]"` (but not in other strings, e.g. docstrings).
+    """
+    names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    for annotation in _annotations(tree):
+        for node in ast.walk(annotation):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                try:
+                    reference = ast.parse(node.value, mode="eval")
+                except SyntaxError:
+                    continue
+                names |= used_names(reference)
+    return names
+
+
+_DOCSTRINGS: Final = re.compile(
+    r"""
+      \"\"\"[^"\\]*(?:(?:\\[\s\S]|"(?!""))[^"\\]*)*\"\"\"
+    | '''[^'\\]*(?:(?:\\[\s\S]|'(?!''))[^'\\]*)*'''
+    """,
+    re.VERBOSE,
+)
+
+_STRINGS_AND_COMMENTS: Final = re.compile(
+    r"""
+      \#[^\n]*
+    | "[^"\\\n]*(?:\\.[^"\\\n]*)*"
+    | '[^'\\\n]*(?:\\.[^'\\\n]*)*'
+    """,
+    re.VERBOSE,
+)
+
+
+def _unless_annotation(match: "re.Match[str]") -> str:
+    """
+    A space in place of a comment, or of a string that isn't an annotation; so that a word in a value,
+    e.g. `"array"` in a default value or a `Literal`, isn't taken for a use of a name from `PROVIDERS`.
+    An annotation, a forward reference such as `-> "Timer"` or `: List["Pin"]`, is kept;
+    as are only the strings that `used_names` would parse, those in an annotation that are expressions.
+    """
+    token = match.group()
+    if token[0] == "#" or _is_value(match.string, match.start()):
+        return " "
+    try:
+        ast.parse(token[1:-1], mode="eval")
+    except SyntaxError:
+        return " "
+    return token
+
+
+def _is_value(text: str, index: int) -> bool:
+    """
+    True if the string starting at `index` of `text` is a value, i.e. doesn't follow `:` or `->`
+    and isn't in a subscript (other than of `Literal`), e.g. a default value or a `TypeVar`'s name.
+    """
+    index = _previous(text, index)
+    if index >= 0 and text[index] == ",":  # Find the bracket the string is in.
+        depth = 0
+        while index >= 0 and (depth or text[index] not in "([{"):
+            if text[index] in ")]}":
+                depth += 1
+            elif text[index] in "([{":
+                depth -= 1
+            elif text[index] == "\n" and text[index + 1 : index + 2] not in " \t)]}":
+                return True  # Reached the start of a statement.
+            index -= 1
+    if index < 0:
+        return True
+    if text[index] == "[":  # A subscript, e.g. `List[`, rather than a list display, unless of `Literal`.
+        end = _previous(text, index) + 1
+        start = end
+        while _is_name_char(text, start - 1):
+            start -= 1
+        return text[start:end] in ("", "Literal")
+    return text[index] not in ":>"
+
+
+def _previous(text: str, index: int) -> int:
+    """
+    The index of the last character before `index` of `text` that isn't a space or a tab, or -1.
+    """
+    index -= 1
+    while index >= 0 and text[index] in " \t":
+        index -= 1
+    return index
+
+
+def _is_used(code: str, name: str) -> bool:
+    """
+    True if `name` occurs in `code` as a whole token, other than as an attribute or where it is bound;
+    i.e. other than as the name of a function or class, or of a parameter or keyword argument.
+    """
+    index = code.find(name)
+    while index >= 0:
+        end = index + len(name)
+        if not (
+            _is_name_char(code, index - 1)
+            or code[index - 1 : index] == "."
+            or _is_name_char(code, end)
+            or _is_bound(code, index, end)
+        ):
+            return True
+        index = code.find(name, end)
+    return False
+
+
+def _is_name_char(code: str, index: int) -> bool:
+    return 0 <= index < len(code) and (code[index].isalnum() or code[index] == "_")
+
+
+def _is_bound(code: str, start: int, end: int) -> bool:
+    """
+    True if the name from `start` to `end` of `code` is the name of a function or class,
+    or of a parameter or keyword argument (follows `(` or `,`, and precedes `:` or `=`).
+    """
+    if code[max(start - 8, 0) : start].split()[-1:] in (["def"], ["class"]):
+        return True
+    before = start - 1
+    while before >= 0 and code[before] in " \t\n*":
+        before -= 1
+    if before < 0 or code[before] not in "(,":
+        return False
+    after = end
+    while code[after : after + 1] in (" ", "\t"):
+        after += 1
+    return code[after : after + 1] in (":", "=") and code[after : after + 2] != "=="
+
+
+_TOP_LEVEL: Final = re.compile(
+    r"""
+    \n(?:
+        (?:async[ \t]+)?(?:def|class)[ \t]+(\w+)
+      | (\w+)(?=[ \t]*(?::|=(?!=)))
+      | from[ \t]+([\w.]+)[ \t]+import[ \t]+(\([^)]*\)|[^\n]*)
+      | import[ \t]+([^\n]*)
+    )
+    """,
+    re.VERBOSE,
+)
+"""
+A top-level definition, assignment, `from` import, or import; at the start of a line.
+"""
+
+_SEPARATORS: Final = str.maketrans(
+    {c: " " for c in map(chr, range(128)) if not (c.isalnum() or c in "_.")}
+)
+"""
+Replaces the characters that aren't part of a name, or an attribute reference, with spaces.
+"""
+
+
+def _scan(text: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    """
+    The names from `PROVIDERS` that typeshed `text` uses, the names it binds at the top level (defines or imports),
+    and the modules it imports from; as `used_names` and `defined_names` would find, plus the imports,
+    but by scanning the text rather than parsing it, since it is done for every module written.
+    A name is used where it is a whole token, outside strings (other than annotations) and comments,
+    other than where it is bound or is an attribute (e.g. the `array` of `uarray.array`), see `_is_used`.
+    """
+    parts = text.split('"""')
+    if len(parts) % 2 and '\\"' not in text and "'''" not in text:
+        code = " ".join(parts[0::2])  # Between the docstrings.
+    else:  # Escaped quotes, `'''`, or an odd `"""`; find the docstrings exactly.
+        code = _DOCSTRINGS.sub(" ", text)
+    code = "\n" + _STRINGS_AND_COMMENTS.sub(_unless_annotation, code)
+    tokens = {
+        reference.split(".", 1)[0]  # Of `typing.List`, only `typing` is used.
+        for reference in set(code.translate(_SEPARATORS).split())
+    }
+    used = {name for name in tokens & PROVIDERS.keys() if _is_used(code, name)}
+    bound: Set[str] = set()
+    imported_from: Set[str] = set()
+    for defined, assigned, module, imported, modules in _TOP_LEVEL.findall(code):
+        if defined or assigned:
+            bound.add(defined or assigned)
+        elif module:
+            imported_from.add(module)
+            for alias in imported.strip("()").split(","):
+                if alias.strip():
+                    bound.add(alias.split()[-1])
+        else:
+            for alias in modules.split(","):
+                if alias.strip():
+                    bound.add(alias.split()[-1].split(".")[0])
+    return used, bound, imported_from
+
+
+def add_imports(pyi: PYI) -> Set[str]:
+    """
+    Add to the start of `pyi.imports_vars_defs` (after the module's `__author__` etc., if any)
+    the imports of the names `pyi` uses from `PROVIDERS` that it neither defines nor imports.
+    Returns the modules that `pyi` then imports from.
+    """
+    used, bound, imported_from = _scan("".join(pyi.iter_chunks()))
+    by_module: Dict[str, List[str]] = {}
+    for name in sorted(used - bound):
+        module = PROVIDERS.get(name)
+        if module is not None:
+            by_module.setdefault(module, []).append(name)
+    if not by_module:
+        return imported_from
+    lines = "\n".join(
+        f"from {module} import {', '.join(by_module[module])}"
+        for module in _PROVIDED
+        if module in by_module
+    )
+    first = pyi.imports_vars_defs[0].lstrip() if pyi.imports_vars_defs else ""
+    if first.startswith("__author__"):
+        pyi.imports_vars_defs.insert(1, "\n" + lines)
+    else:
+        pyi.imports_vars_defs.insert(0, lines)
+    return imported_from | set(by_module)
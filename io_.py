@@ -16,12 +16,6 @@ def io(shed: RST2PyI) -> None:
         name="io",
         old="input/output streams",
         post_doc=f'''
-from types import TracebackType
-from typing import TypeVar, Final, Protocol, runtime_checkable, Literal
-from typing import AnyStr, overload, Type
-
-from uarray import array
-
 _T: Final = TypeVar("_T")
 
 _OpenTextModeUpdating: Final = Literal[
@@ -92,25 +86,9 @@ _OpenBinaryModeWriting: Final = Literal["wb", "bw", "ab", "ba", "xb", "bx"]
 _OpenBinaryModeReading: Final = Literal["rb", "br", "rbU", "rUb", "Urb", "brU", "bUr", "Ubr"]
 _OpenBinaryMode: Final = _OpenBinaryModeUpdating | _OpenBinaryModeReading | _OpenBinaryModeWriting
 
-AnyStr_co: Final = TypeVar("AnyStr_co", str, bytes, covariant=True)
-@runtime_checkable
-class PathLike(Protocol[AnyStr_co]):
-    def __fspath__(self) -> AnyStr_co: 
-        ...
-
-StrOrBytesPath: Final = str | bytes | PathLike[str] | PathLike[bytes]
-_OpenFile: Final = StrOrBytesPath | int
-
-AnyReadableBuf: Final = TypeVar('AnyReadableBuf', bytearray, array, memoryview, bytes)
-"""
-Type that allows bytearray, array, memoryview, or bytes, 
-but only one of these and not a mixture in a single declaration.
-"""
-
-AnyWritableBuf: Final = TypeVar('AnyWritableBuf', bytearray, array, memoryview)
-"""
-Type that allows bytearray, array, or memoryview, but only one of these and not a mixture in a single declaration.
-"""
+# Shared with other modules, see `_aliases.pyi`; re-exported since they are part of `io`'s interface.
+from _aliases import AnyStr_co as AnyStr_co, PathLike as PathLike, StrOrBytesPath as StrOrBytesPath
+from _aliases import AnyReadableBuf as AnyReadableBuf, AnyWritableBuf as AnyWritableBuf
 
 _Self: Final = TypeVar('_Self')  # The type that extends `IOBase`.
 
@@ -0,0 +1,109 @@
+"""
+Journal of a module's declarations, recorded whilst generating so that the module can be rebuilt without its `.rst`
+files, see `RST2PyI.journal_dir` and `RST2PyI.replay`.
+Since most changes are to rendering, e.g. `RST2PyI._doc_str_gen` or `PYI.__str__`, not parsing,
+replaying the journals is a much quicker way to regenerate than fetching and parsing again.
+
+Each entry is an `[op, args]` pair, either:
+
+  1. The result of a declaration resolved from the `.rst` files, `op` is an `RST2PyI._add_<op>` method
+    and `args` its keyword arguments.
+  2. A change a generator made directly to the `PYI`, e.g. `shed.pyi.classes[-1].defs.append(...)`;
+    `op` is `pyi_extend` or `pyi_set` of a list of lines, or `pyi_class` for a whole class.
+  3. The `write` of the module, `args` are its keyword arguments.
+
+Direct changes are found by comparing the lists of lines in the `PYI` before each declaration
+with how they were after the previous one, see `Journal.sync`; generators only add to them.
+"""
+
+import json
+from dataclasses import dataclass, field, asdict
+from typing import List, Any, Dict, Tuple, Iterator, Optional
+
+import rst
+from class_ import Class
+from pyi import PYI
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+_Key = Tuple[Optional[int], str]
+"""
+A list of lines in a `PYI`, a field of the `PYI` (class `None`) or of one of its classes (by index).
+"""
+
+
+@dataclass
+class Journal:
+    """
+    The `entries` of a module's journal, see module doc.
+    """
+
+    entries: List[List[Any]] = field(default_factory=list)
+    _classes: int = 0
+    _seen: Dict[_Key, Tuple[int, int]] = field(default_factory=dict)
+
+    @staticmethod
+    def load(path: str) -> "Journal":
+        with open(path) as f:
+            return Journal(entries=json.load(f))
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.entries, f, separators=(",", ":"))
+
+    @staticmethod
+    def _lists(pyi: PYI) -> Iterator[Tuple[_Key, List[str]]]:
+        yield (None, "doc"), pyi.doc
+        yield (None, "imports_vars_defs"), pyi.imports_vars_defs
+        for index, class_ in enumerate(pyi.classes):
+            yield (index, "doc"), class_.doc
+            yield (index, "imports_vars"), class_.imports_vars
+            yield (index, "defs"), class_.defs
+
+    def sync(self, pyi: PYI) -> None:
+        """
+        Record the changes made directly to `pyi` since the last `sync` or `seen`.
+        """
+        for class_ in pyi.classes[self._classes :]:
+            self.entries.append(["pyi_class", asdict(class_)])
+        self._classes = len(pyi.classes)
+        for (index, name), lines in Journal._lists(pyi):
+            seen = self._seen.get((index, name))
+            if seen is None:
+                continue  # In a class just recorded whole.
+            seen_id, seen_len = seen
+            if seen_id == id(lines) and seen_len <= len(lines):
+                if seen_len < len(lines):
+                    args = {"index": index, "name": name, "lines": lines[seen_len:]}
+                    self.entries.append(["pyi_extend", args])
+            else:
+                args = {"index": index, "name": name, "lines": list(lines)}
+                self.entries.append(["pyi_set", args])
+        self.seen(pyi)
+
+    def seen(self, pyi: PYI) -> None:
+        """
+        Note the current state of `pyi`, e.g. after a recorded declaration has changed it.
+        """
+        self._classes = len(pyi.classes)
+        self._seen = {key: (id(lines), len(lines)) for key, lines in Journal._lists(pyi)}
+
+    @staticmethod
+    def redo(pyi: PYI, op: str, args: Dict[str, Any]) -> None:
+        """
+        Redo a direct change, op `pyi_...`, to `pyi`.
+        """
+        if op == "pyi_class":
+            pyi.classes.append(Class(**args))
+            return
+        index = args["index"]
+        owner = pyi if index is None else pyi.classes[index]
+        lines = getattr(owner, args["name"])
+        if op == "pyi_extend":
+            lines.extend(args["lines"])
+        else:
+            assert op == "pyi_set", f"Unknown journal entry `{op}`!"
+            lines[:] = args["lines"]
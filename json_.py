@@ -15,8 +15,6 @@ def json(shed: RST2PyI) -> None:
         name="json",
         old="JSON encoding and decoding",
         post_doc=f"""
-from typing import Any, AnyStr
-
 from uio import IOBase
 """,
         end="Functions",
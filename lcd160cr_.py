@@ -16,10 +16,7 @@ def lcd160cr(shed: RST2PyI) -> None:
         name=r"lcd160cr",
         old="control of LCD160CR display",
         post_doc=f"""
-from typing import overload, Any, Final
-
 from pyb import Pin, I2C, SPI
-from uio import AnyReadableBuf, AnyWritableBuf
 """,
         end=r"..",
     )
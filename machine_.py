@@ -882,11 +882,7 @@ def irq(
 
 def _machine(shed: RST2PyI) -> None:
     module_post_doc = f"""
-from typing import overload, NoReturn, Callable
-from typing import Sequence, ClassVar, Any, Final
-
 from uos import AbstractBlockDev
-from uio import AnyReadableBuf, AnyWritableBuf
 """
     shed.module(
         name="machine",
@@ -4,50 +4,39 @@
 Convert MicroPython `.rst` documentation files into `.pyi` typeshed stub interfaces.
 """
 
-from sys import argv
+import traceback
+from argparse import ArgumentParser, RawDescriptionHelpFormatter, Namespace
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib import import_module
+from importlib.util import find_spec
+from os import makedirs, cpu_count, getpid
+from os.path import getsize, join, exists
+from sys import stderr
+from typing import Callable, Final, Tuple, Optional, Dict, List, Any
 
 import rst
-from adcwipy_ import adc_wipy
-from array_ import array
-from binascii_ import binascii
-from bluetooth_ import bluetooth
-from btree_ import btree
-from cmath_ import cmath
-from collections_ import collections
-from cryptolib_ import cryptolib
-from errno_ import errno
-from esp32_ import esp32
-from esp_ import esp
-from framebuf_ import framebuf
-from gc_ import gc
-from hashlib_ import hashlib
-from heapq_ import heapq
-from io_ import io
-from json_ import json
-from lcd160cr_ import lcd160cr
-from machine_ import machine
-from math_ import math
-from micropython_ import micropython
-from neopixel_ import neopixel
-from network_ import network
-from os_ import os
-from pyb_ import pyb
-from random_ import random
-from re_ import re
+import counting
+import memory
+import timing
+import tracing
+from counting import Counters
+from fetch import (
+    prefetch,
+    Prefetched,
+    DiskCache,
+    ConnectionPool,
+    LocalDocs,
+    GitHubBlobs,
+    GitObjects,
+)
+from manifest import Manifest
+from memory import MemoryProfile
+from rst import RST, Fetch
 from rst2pyi import RST2PyI
-from select_ import select
-from socket_ import socket
-from ssl_ import ssl
-from stm_ import stm
-from struct_ import struct
-from sys_ import sys
-from thread_ import thread
-from time_ import time
-from timerwipy_ import timer_wipy
-from uasyncio_ import uasyncio
-from uctypes_ import uctypes
-from wipy_ import wipy
-from zlib_ import zlib
+from timing import Timings
+from tracing import Tracer
+from validate import validate
 
 __author__ = rst.__author__
 __copyright_ = rst.__copyright__
@@ -55,6 +44,372 @@ __license__ = rst.__license__
 __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
 
 
+@dataclass(frozen=True)
+class Generator:
+    """
+    A generator, `function` in `module`, of the typeshed for the module whose `.rst` file is `name` (less `.rst`).
+    The generator's module is only imported when the generator is `load`ed.
+    """
+
+    name: str
+    module: str
+    function: str
+
+    def load(self) -> Callable[[RST2PyI], None]:
+        return getattr(import_module(self.module), self.function)
+
+    @property
+    def file(self) -> str:
+        """
+        The generator's source file (found without importing it).
+        """
+        spec = find_spec(self.module)
+        assert spec is not None and spec.origin, f"`{self.module}` not found!"
+        return spec.origin
+
+
+_GENERATORS: Final[Tuple[Generator, ...]] = (
+    Generator("machine.TimerWiPy", "timerwipy_", "timer_wipy"),
+    Generator("machine.ADCWiPy", "adcwipy_", "adc_wipy"),
+    Generator("wipy", "wipy_", "wipy"),
+    Generator("esp32", "esp32_", "esp32"),
+    Generator("esp", "esp_", "esp"),
+    Generator("random", "random_", "random"),
+    Generator("stm", "stm_", "stm"),
+    Generator("neopixel", "neopixel_", "neopixel"),
+    Generator("_thread", "thread_", "thread"),
+    Generator("zlib", "zlib_", "zlib"),
+    Generator("time", "time_", "time"),
+    Generator("sys", "sys_", "sys"),
+    Generator("struct", "struct_", "struct"),
+    Generator("ssl", "ssl_", "ssl"),
+    Generator("socket", "socket_", "socket"),
+    Generator("select", "select_", "select"),
+    Generator("re", "re_", "re"),
+    Generator("os", "os_", "os"),
+    Generator("json", "json_", "json"),
+    Generator("io", "io_", "io"),
+    Generator("heapq", "heapq_", "heapq"),
+    Generator("hashlib", "hashlib_", "hashlib"),
+    Generator("errno", "errno_", "errno"),
+    Generator("collections", "collections_", "collections"),
+    Generator("binascii", "binascii_", "binascii"),
+    Generator("uasyncio", "uasyncio_", "uasyncio"),
+    Generator("math", "math_", "math"),
+    Generator("gc", "gc_", "gc"),
+    Generator("cmath", "cmath_", "cmath"),
+    Generator("uctypes", "uctypes_", "uctypes"),
+    Generator("cryptolib", "cryptolib_", "cryptolib"),
+    Generator("bluetooth", "bluetooth_", "bluetooth"),
+    Generator("network", "network_", "network"),
+    Generator("micropython", "micropython_", "micropython"),
+    Generator("framebuf", "framebuf_", "framebuf"),
+    Generator("btree", "btree_", "btree"),
+    Generator("machine", "machine_", "machine"),
+    Generator("lcd160cr", "lcd160cr_", "lcd160cr"),
+    Generator("array", "array_", "array"),
+    Generator("pyb", "pyb_", "pyb"),
+)
+"""
+The generators, in the order they are run.
+"""
+
+
+def _select(only: List[str], exclude: List[str]) -> List[Generator]:
+    """
+    The generators named in `only` (all if empty) less those named in `exclude`, in run order.
+    """
+    return [
+        generator
+        for generator in _GENERATORS
+        if (not only or generator.name in only) and generator.name not in exclude
+    ]
+
+
+def _generate(
+    generators: List[Generator],
+    output_root_dir: str,
+    fetch: Fetch,
+    *,
+    jobs: int,
+    force: bool,
+    shed_options: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Run the `generators` whose inputs have changed since the last run (all of them if `force`),
+    either serially sharing one `RST2PyI` or with each in one of `jobs` worker processes.
+    The `.pyi` files are identical either way.
+    A generator that fails is reported once the others have run, and isn't recorded in the manifest.
+    The `shed_options` are further `RST2PyI` options, e.g. `journal_dir`, `u_mode`, `slim_dir`, and `packages`.
+    """
+    shed_options = shed_options or {}
+    manifest = Manifest.load(output_root_dir)
+    todo = [
+        generator
+        for generator in generators
+        if force
+        or not manifest.is_up_to_date(
+            generator.name,
+            generator_file=generator.file,
+            fetch=fetch,
+            options=shed_options,
+        )
+    ]
+    print(f"Generating {len(todo)} of {len(generators)} modules (rest unchanged).")
+    failures: List[Tuple[Generator, str]] = []
+    changed: List[str] = []
+    try:
+        if jobs <= 1:
+            shed: Optional[RST2PyI] = None
+            for generator in todo:
+                if shed is None:
+                    shed = RST2PyI(
+                        output_root_dir=output_root_dir,
+                        rst=RST(fetch=fetch),
+                        **shed_options,
+                    )
+                shed.rst.sources.clear()
+                shed.written.clear()
+                shed.changed.clear()
+                failure = None
+                try:
+                    _run(generator, shed)
+                except Exception:
+                    failure = traceback.format_exc()
+                if shed.changed:
+                    changed.append(generator.name)
+                if failure is None:
+                    manifest.record(
+                        generator.name,
+                        generator_file=generator.file,
+                        sources=shed.rst.sources,
+                        outputs=shed.written,
+                        options=shed_options,
+                    )
+                else:
+                    failures.append((generator, failure))
+                    shed = None  # Don't start the next generator with the failed one's partial module.
+        else:
+            # Run the biggest generators (e.g. `pyb_.py` and `machine_.py`) first,
+            # so that they don't form the tail of the run.
+            todo.sort(key=lambda generator: getsize(generator.file), reverse=True)
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(
+                    output_root_dir,
+                    fetch,
+                    shed_options,
+                    timing.timings is not None,
+                    tracing.tracer is not None,
+                    counting.counters is not None,
+                    memory.profile is not None,
+                ),
+            ) as executor:
+                futures = [
+                    (generator, executor.submit(_generate_in_worker, generator))
+                    for generator in todo
+                ]
+                workers: Dict[int, float] = {}  # Worker's pid to when it started.
+                for generator, future in futures:
+                    outcome = future.result()
+                    if timing.timings is not None and outcome.timings is not None:
+                        timing.timings.merge(outcome.timings)
+                    if counting.counters is not None and outcome.counters is not None:
+                        counting.counters.merge(outcome.counters)
+                    if memory.profile is not None and outcome.memory is not None:
+                        memory.profile.merge(outcome.memory)
+                    if tracing.tracer is not None and outcome.trace is not None:
+                        tracing.tracer.merge(outcome.trace)
+                        workers[outcome.pid] = outcome.trace.started
+                    if outcome.changed:
+                        changed.append(generator.name)
+                    if outcome.failure is None:
+                        manifest.record(
+                            generator.name,
+                            generator_file=generator.file,
+                            sources=outcome.sources,
+                            outputs=outcome.written,
+                            options=shed_options,
+                        )
+                    else:
+                        failures.append((generator, outcome.failure))
+            if tracing.tracer is not None:
+                for pid, started in workers.items():  # Workers have stopped.
+                    tracing.tracer.span("worker", "worker", started, pid=pid)
+                    tracing.tracer.name_process(f"worker {pid}", pid=pid)
+    finally:
+        manifest.save()
+    _print_changed(changed, len(todo))
+    for generator, failure in failures:
+        name = f"{generator.module}.{generator.function}"
+        print(f"Generator `{name}` failed:\n{failure}", file=stderr)
+    if failures:
+        raise SystemExit(f"{len(failures)} of {len(todo)} generators failed!")
+
+
+def _print_changed(changed: List[str], generated: int) -> None:
+    """
+    Summarise which of the `generated` modules `changed`, i.e. whose `.pyi` files were rewritten.
+    """
+    if changed:
+        print(f"Changed {len(changed)} of {generated} modules: {', '.join(changed)}.")
+    else:
+        print(f"None of the {generated} modules changed.")
+
+
+@dataclass(frozen=True)
+class _Outcome:
+    """
+    The outcome of running a generator in a worker, `pid`:
+    the formatted exception if it failed, the sources read and files written (for the `Manifest`),
+    the files whose content changed, the worker's `Timings` (if timing), its trace (if tracing),
+    its `Counters` (if counting), and its `MemoryProfile` (if profiling memory).
+    """
+
+    failure: Optional[str]
+    sources: Dict[str, str]
+    written: List[str]
+    changed: List[str]
+    timings: Optional[Timings]
+    pid: int
+    trace: Optional[Tracer]
+    counters: Optional[Counters]
+    memory: Optional[MemoryProfile]
+
+
+_worker_args: Optional[Tuple[str, Fetch, Dict[str, Any]]] = None
+"""
+Each worker process's `output_root_dir`, `fetch`, and `shed_options`, see `_init_worker`.
+"""
+
+
+def _init_worker(
+    output_root_dir: str,
+    fetch: Fetch,
+    shed_options: Dict[str, Any],
+    timed: bool,
+    traced: bool,
+    counted: bool,
+    profiled: bool,
+) -> None:
+    global _worker_args
+    _worker_args = output_root_dir, fetch, shed_options
+    if timed:
+        timing.timings = Timings()
+    if traced:
+        tracing.tracer = Tracer()
+    if counted:
+        counting.enable(Counters())
+    if profiled:
+        memory.start(MemoryProfile())
+
+
+def _generate_in_worker(generator: Generator) -> _Outcome:
+    """
+    Run `generator`, with its own `RST2PyI`, in a worker.
+    """
+    assert _worker_args is not None, "Worker not initialised!"
+    output_root_dir, fetch, shed_options = _worker_args
+    shed = RST2PyI(
+        output_root_dir=output_root_dir,
+        rst=RST(fetch=fetch),
+        **shed_options,
+    )
+    failure = None
+    try:
+        _run(generator, shed)
+    except Exception:
+        failure = traceback.format_exc()
+    timings = timing.timings
+    if timings is not None:
+        timing.timings = Timings()  # Each outcome has just its generator's timings.
+    trace = tracing.tracer
+    if trace is not None:
+        # Each outcome has just its generator's events, but the worker's start.
+        tracing.tracer = Tracer(started=trace.started)
+    counters = counting.counters
+    if counters is not None:
+        counting.enable(Counters())  # Each outcome has just its generator's counts.
+    profile = memory.profile
+    if profile is not None:
+        memory.profile = MemoryProfile()  # Each outcome has just its generator's module.
+    return _Outcome(
+        failure,
+        shed.rst.sources,
+        shed.written,
+        shed.changed,
+        timings,
+        getpid(),
+        trace,
+        counters,
+        profile,
+    )
+
+
+def _run(generator: Generator, shed: RST2PyI) -> None:
+    """
+    Run `generator` with `shed`, as a span if tracing and recording its memory use if profiling memory.
+    """
+    start = tracing.now()
+    profile = memory.profile
+    if profile is not None:
+        profile.begin(generator.name, shed.output_root_dir)
+    try:
+        generator.load()(shed)
+    finally:
+        if profile is not None:
+            profile.end()
+        if tracing.tracer is not None:
+            name = f"{generator.module}.{generator.function}"
+            tracing.tracer.span("generate", "generator", start, generator=name)
+
+
+def _replay(
+    generators: List[Generator],
+    output_root_dir: str,
+    journal_dir: str,
+    shed_options: Dict[str, Any],
+) -> None:
+    """
+    Rebuild the modules of `generators` from their journals in `journal_dir`, see module `journal`,
+    using `RST2PyI` options `shed_options`, see `_generate`.
+    """
+    paths = [join(journal_dir, generator.name + ".json") for generator in generators]
+    missing = [path for path in paths if not exists(path)]
+    if missing:
+        raise SystemExit(f"No journal(s) {missing}, generate with `--journal` first!")
+    print(f"Replaying {len(paths)} modules.")
+    shed = RST2PyI(output_root_dir=output_root_dir, **shed_options)
+    changed: List[str] = []
+    for generator, path in zip(generators, paths):
+        shed.changed.clear()
+        shed.replay(path)
+        if shed.changed:
+            changed.append(generator.name)
+    _print_changed(changed, len(paths))
+
+
+def _validate(
+    generators: List[Generator], output_root_dir: str, *, jobs: int, mypy: bool
+) -> None:
+    """
+    Validate the files written by the `generators`, as recorded in the manifest, see module `validate`.
+    """
+    manifest = Manifest.load(output_root_dir)
+    outputs: Dict[str, str] = {}
+    for generator in generators:
+        entry = manifest.entries.get(generator.name)
+        if entry is not None:
+            for output in entry["outputs"]:
+                outputs.setdefault(output, generator.file)
+    failures = validate(output_root_dir, outputs, jobs=jobs, mypy=mypy)
+    for failure in failures:
+        print(failure, file=stderr)
+    if failures:
+        raise SystemExit(f"{len(failures)} validation failure(s)!")
+
+
 def main() -> None:
     usage = """
 
@@ -63,49 +418,357 @@ Usage (from `PyBoardTypeshedGenerator`'s directory) one of:
   1. `python3 main.py <destination root directory>`.
   2. `./main.py <destination root directory>` (if `main.py` is executable).
 """
-    assert len(argv) > 1, "No destination root directory given." + usage
-    assert len(argv) == 2, "Extra argument(s) given." + usage
-    shed = RST2PyI(output_root_dir=argv[1])
-    timer_wipy(shed)
-    adc_wipy(shed)
-    wipy(shed)
-    esp32(shed)
-    esp(shed)
-    random(shed)
-    stm(shed)
-    neopixel(shed)
-    thread(shed)
-    zlib(shed)
-    time(shed)
-    sys(shed)
-    struct(shed)
-    ssl(shed)
-    socket(shed)
-    select(shed)
-    re(shed)
-    os(shed)
-    json(shed)
-    io(shed)
-    heapq(shed)
-    hashlib(shed)
-    errno(shed)
-    collections(shed)
-    binascii(shed)
-    uasyncio(shed)
-    math(shed)
-    gc(shed)
-    cmath(shed)
-    uctypes(shed)
-    cryptolib(shed)
-    bluetooth(shed)
-    network(shed)
-    micropython(shed)
-    framebuf(shed)
-    btree(shed)
-    machine(shed)
-    lcd160cr(shed)
-    array(shed)
-    pyb(shed)
+    parser = ArgumentParser(
+        description=__doc__.strip(),
+        epilog=usage,
+        formatter_class=RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("destination", help="destination root directory")
+    parser.add_argument(
+        "--prefetch-workers",
+        type=int,
+        default=8,
+        metavar="N",
+        help="fetch the `.rst` files up front using N threads, 0 to fetch each file when needed (default 8)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="",
+        metavar="DIR",
+        help="keep the fetched `.rst` files in DIR between runs (default no cache)",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DiskCache.max_bytes,
+        metavar="BYTES",
+        help="evict least recently used files from the cache above BYTES "
+        f"(default {DiskCache.max_bytes})",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        default=DiskCache.max_age,
+        metavar="SECONDS",
+        help="revalidate cached files older than SECONDS "
+        f"(default {DiskCache.max_age:g})",
+    )
+    parser.add_argument(
+        "--docs-dir",
+        default="",
+        metavar="DIR",
+        help="read the `.rst` files from DIR, a local checkout of MicroPython's "
+        "`docs/library`, instead of fetching them (default fetch)",
+    )
+    parser.add_argument(
+        "--git-repo",
+        default="",
+        metavar="DIR",
+        help="read the `.rst` files from DIR, a local clone of MicroPython's git repository, "
+        "at `master` or each of `--versions`, without checking them out or fetching them (default fetch)",
+    )
+    parser.add_argument(
+        "--versions",
+        nargs="+",
+        default=[],
+        metavar="VERSION",
+        help="generate the typesheds of each of the given versions (tags, branches, or commits) of MicroPython's "
+        "docs, e.g. `v1.18 v1.19`, into `<destination>/<version>`; each distinct `.rst` file is fetched once "
+        "and a `.pyi` file identical to the previous version's is hard linked to it (default `master` only)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="generate the modules using N worker processes (default 1, i.e. serially)",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        default=[],
+        metavar="MODULE",
+        help="only generate the given modules, e.g. `--only machine pyb` (default all)",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="+",
+        default=[],
+        metavar="MODULE",
+        help="don't generate the given modules (default none)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="regenerate every module, rather than just those whose inputs changed",
+    )
+    parser.add_argument(
+        "--u-mode",
+        choices=RST2PyI.U_MODES,
+        default="copy",
+        help="write the `u` aliases of modules, e.g. `uio.pyi`, as a copy, a `from io import *` re-export stub, "
+        "or a symbolic link (default copy)",
+    )
+    parser.add_argument(
+        "--slim-dir",
+        default="",
+        metavar="DIR",
+        help="also write each module without docstrings to DIR, e.g. for quicker type checking "
+        "(default no slim modules)",
+    )
+    parser.add_argument(
+        "--packages",
+        nargs="+",
+        default=[],
+        metavar="MODULE",
+        help="write the given modules, e.g. `pyb machine`, as packages with a submodule per class, "
+        "which are quicker for type checkers and editors to load in part; "
+        "their public names are unchanged (default none)",
+    )
+    parser.add_argument(
+        "--journal",
+        default="",
+        metavar="DIR",
+        help="journal each generated module's declarations in DIR, for `--replay` (default no journal)",
+    )
+    parser.add_argument(
+        "--replay",
+        default="",
+        metavar="DIR",
+        help="rebuild the modules from their journals in DIR, without reading any `.rst` files; "
+        "quick when only the rendering has changed",
+    )
+    parser.add_argument(
+        "--validate",
+        choices=["parse", "mypy", "none"],
+        default="parse",
+        help="after generating, check that every `.pyi` file parses (in parallel), "
+        "and with `mypy` also type check them with one mypy run if mypy is installed; "
+        "failures give the generator line responsible (default parse)",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="print the time spent in each phase (fetch, scan, parse, render, write) "
+        "per module and source",
+    )
+    parser.add_argument(
+        "--trace",
+        default="",
+        metavar="FILE",
+        help="write a Chrome trace (JSON, view in https://ui.perfetto.dev) of the run to FILE, "
+        "with spans for each `.rst` file read, declaration, write, generator, and worker process",
+    )
+    parser.add_argument(
+        "--timings-json",
+        default="",
+        metavar="FILE",
+        help="write the timings (see `--timings`) to FILE as JSON",
+    )
+    parser.add_argument(
+        "--counters",
+        action="store_true",
+        help="print the generator functions that make the parsing primitives do the most work "
+        "(lines popped, pushed back, and skipped, `is_end` calls, and bytes decoded), see `counting.py`",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        default="",
+        metavar="FILE",
+        help="trace memory (slow) and write the peak per module generated, and the top allocation sites "
+        "in `rst.py`, `rst2pyi.py`, `pyi.py`, and `class_.py`, to FILE as JSON, see `memory.py` "
+        "(not written if empty, e.g. with `--replay`)",
+    )
+    parser.add_argument(
+        "--counters-json",
+        default="",
+        metavar="FILE",
+        help="write the counts (see `--counters`) of every generator function to FILE as JSON",
+    )
+    args = parser.parse_args()
+    names = {generator.name for generator in _GENERATORS}
+    given = set(args.only) | set(args.exclude) | set(args.packages)
+    unknown = sorted(given - names)
+    if unknown:
+        parser.error(f"unknown module(s) {unknown}, known are {sorted(names)}")
+    generators = _select(args.only, args.exclude)
+    if args.timings or args.timings_json:
+        timing.timings = Timings()
+    if args.trace:
+        tracing.tracer = Tracer()
+        tracing.tracer.name_process("main")
+    if args.counters or args.counters_json:
+        counting.enable(Counters())
+    if args.profile_memory:
+        memory.start(MemoryProfile())
+    if args.versions and args.docs_dir:
+        parser.error("`--docs-dir` is one version of the docs, so can't have `--versions`")
+    if args.git_repo and args.docs_dir:
+        parser.error("read the `.rst` files from either `--git-repo` or `--docs-dir`, not both")
+    for version in _versions(args):
+        options = _shed_options(args, version)
+        output_root_dir = _output_root(args, version)
+        for directory in (output_root_dir, options["journal_dir"], options["slim_dir"]):
+            if directory:
+                makedirs(directory, exist_ok=True)
+    if args.replay:
+        for version in _versions(args):
+            options = _shed_options(args, version)
+            del options["journal_dir"]
+            journal_dir = args.replay if version is None else join(args.replay, version)
+            _replay(generators, _output_root(args, version), journal_dir, options)
+    else:
+        _fetch_or_read_and_generate(generators, args)
+    if args.validate != "none":
+        for version in _versions(args):
+            _validate(
+                generators,
+                _output_root(args, version),
+                jobs=max(args.jobs, cpu_count() or 1),
+                mypy=args.validate == "mypy",
+            )
+    if tracing.tracer is not None:
+        tracing.tracer.write_json(args.trace)
+    if timing.timings is not None:
+        if args.timings:
+            print(timing.timings.table())
+        if args.timings_json:
+            timing.timings.write_json(args.timings_json)
+    if counting.counters is not None:
+        if args.counters:
+            print(counting.counters.table())
+        if args.counters_json:
+            counting.counters.write_json(args.counters_json)
+    if memory.profile is not None:
+        peak = memory.profile.peak()
+        if peak is None:
+            reason = (
+                "`--replay` isn't profiled, it reads no `.rst` files"
+                if args.replay
+                else "no module was generated"
+            )
+            print(
+                f"Memory report empty, {reason}; not writing {args.profile_memory}.",
+                file=stderr,
+            )
+        else:
+            memory.profile.write_json(args.profile_memory)
+            print(
+                f"Peak traced memory {peak['peak_bytes'] / 2 ** 20:.1f} MiB, "
+                f"generating `{peak['module']}` (see {args.profile_memory})."
+            )
+
+
+def _versions(args: Namespace) -> List[Optional[str]]:
+    """
+    The `--versions` to generate, or just `None` for the default (`master`).
+    """
+    return args.versions or [None]
+
+
+def _output_root(args: Namespace, version: Optional[str]) -> str:
+    """
+    The output root directory of `version` (`None` for the default).
+    """
+    return args.destination if version is None else join(args.destination, version)
+
+
+def _shed_options(args: Namespace, version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    The `RST2PyI` options given by `args`, for `version` (`None` for the default).
+    Each of the `--versions` has its own journal and slim directories, within those given,
+    and hard links files identical to the previous version's.
+    """
+    options = {
+        "journal_dir": args.journal,
+        "u_mode": args.u_mode,
+        "slim_dir": args.slim_dir,
+        "packages": sorted(args.packages),
+    }
+    if version is None:
+        return options
+    for key in ("journal_dir", "slim_dir"):
+        if options[key]:
+            options[key] = join(options[key], version)
+    options["input_base_url"] = RST2PyI.versioned_base_url(version)
+    index = args.versions.index(version)
+    if index:
+        previous = args.versions[index - 1]
+        link_dirs = {_output_root(args, version): _output_root(args, previous)}
+        if args.slim_dir:
+            link_dirs[join(args.slim_dir, version)] = join(args.slim_dir, previous)
+        options["link_dirs"] = link_dirs
+    return options
+
+
+def _fetch_or_read_and_generate(generators: List[Generator], args: Namespace) -> None:
+    """
+    Generate from the `.rst` files read from `--docs-dir` or `--git-repo`, or else fetched.
+    """
+    if args.docs_dir:
+        fetch: Fetch = LocalDocs(
+            directory=args.docs_dir, base_url=RST2PyI._input_base_url
+        )
+        _generate_versions(generators, args, fetch)
+    elif args.git_repo:
+        git = GitObjects(args.git_repo, RST2PyI._input_base_url_format)
+        try:
+            _generate_versions(generators, args, git)
+        finally:
+            git.close()
+    else:
+        _fetch_and_generate(generators, args)
+
+
+def _fetch_and_generate(generators: List[Generator], args: Namespace) -> None:
+    """
+    Generate from the `.rst` files fetched over pooled connections, optionally cached and/or prefetched.
+    """
+    pool = ConnectionPool()
+    fetch: Fetch = pool
+    if args.cache_dir:
+        fetch = DiskCache(
+            args.cache_dir,
+            max_bytes=args.cache_max_bytes,
+            max_age=args.cache_max_age,
+            get=pool.get,
+        )
+    if args.versions:
+        fetch = GitHubBlobs(RST2PyI._input_base_url_format, fetch=fetch)
+    try:
+        if args.prefetch_workers > 0:
+            base_urls = [
+                RST2PyI.versioned_base_url(version) for version in args.versions
+            ] or [RST2PyI._input_base_url]
+            urls = (
+                base_url + generator.name + ".rst"
+                for base_url in base_urls
+                for generator in generators
+            )
+            contents = prefetch(urls, fetch=fetch, max_workers=args.prefetch_workers)
+            fetch = Prefetched(contents, fallback=fetch)
+        _generate_versions(generators, args, fetch)
+    finally:
+        pool.close()
+
+
+def _generate_versions(
+    generators: List[Generator], args: Namespace, fetch: Fetch
+) -> None:
+    """
+    Generate each of the `--versions` (or just the default) in turn, in order, so that each can link to the previous.
+    """
+    for version in _versions(args):
+        if version is not None:
+            print(f"Version {version}:")
+        _generate(
+            generators,
+            _output_root(args, version),
+            fetch,
+            jobs=args.jobs,
+            force=args.force,
+            shed_options=_shed_options(args, version),
+        )
 
 
 if __name__ == "__main__":
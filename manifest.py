@@ -0,0 +1,133 @@
+"""
+Build manifest for incremental generation; records the inputs and outputs of each module's generator,
+so that a module is only regenerated when one of its inputs has changed.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Dict, Any, Final, Tuple, List, ClassVar, Optional
+
+import rst
+from rst import Fetch
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+CORE_FILES: Final[Tuple[str, ...]] = (
+    "rst2pyi.py",
+    "pyi.py",
+    "class_.py",
+    "rst.py",
+    "slim.py",
+    "split.py",
+    "imports.py",
+)
+"""
+The code shared by all the generators, a change to any of these regenerates every module.
+"""
+
+_here: Final = os.path.dirname(os.path.abspath(__file__))
+
+
+def hash_bytes(content: bytes) -> str:
+    return sha256(content).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hash_bytes(f.read())
+
+
+@dataclass
+class Manifest:
+    """
+    The manifest, `file_name` in the output root directory, of a generation run.
+    For each module it records the hashes of:
+
+      1. The `.rst` files the module consumed (by URL).
+      2. The generator's source, e.g. `pyb_.py`, and the shared core, `CORE_FILES`.
+      3. The `.pyi` files written (relative to the output root directory).
+
+    It also records the `RST2PyI` options, e.g. `slim_dir`, since changing them changes the outputs.
+    """
+
+    path: str
+    entries: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    file_name: ClassVar[str] = ".rst2pyi-manifest.json"
+
+    @staticmethod
+    def load(output_root_dir: str) -> "Manifest":
+        path = os.path.join(output_root_dir, Manifest.file_name)
+        try:
+            with open(path) as f:
+                return Manifest(path=path, entries=json.load(f))
+        except (OSError, ValueError):
+            return Manifest(path=path)
+
+    def save(self) -> None:
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+
+    @staticmethod
+    def _code_hashes(generator_file: str) -> Dict[str, str]:
+        files = [os.path.join(_here, core) for core in CORE_FILES] + [generator_file]
+        return {os.path.basename(file): hash_file(file) for file in files}
+
+    def is_up_to_date(
+        self,
+        name: str,
+        *,
+        generator_file: str,
+        fetch: Fetch,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        True if module `name`'s outputs exist and are as recorded, and none of its inputs, or `options`, have changed.
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            return False
+        output_root_dir = os.path.dirname(self.path)
+        try:
+            if entry.get("options", {}) != (options or {}):
+                return False
+            if entry["code"] != Manifest._code_hashes(generator_file):
+                return False
+            for output, output_hash in entry["outputs"].items():
+                if hash_file(os.path.join(output_root_dir, output)) != output_hash:
+                    return False
+            for url, source_hash in entry["sources"].items():
+                if hash_bytes(fetch(url)) != source_hash:
+                    return False
+        except Exception:  # E.g. a missing output or a source that can't be fetched.
+            return False
+        return True
+
+    def record(
+        self,
+        name: str,
+        *,
+        generator_file: str,
+        sources: Dict[str, str],
+        outputs: List[str],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record that module `name` was generated, by `generator_file` with `options`,
+        from `sources` (URL to hash) into `outputs`.
+        """
+        output_root_dir = os.path.dirname(self.path)
+        self.entries[name] = {
+            "options": dict(options or {}),
+            "code": Manifest._code_hashes(generator_file),
+            "sources": dict(sources),
+            "outputs": {
+                output: hash_file(os.path.join(output_root_dir, output))
+                for output in outputs
+            },
+        }
@@ -15,7 +15,6 @@ def math(shed: RST2PyI) -> None:
     shed.module(
         name="math",
         old="mathematical functions",
-        post_doc="from typing import SupportsFloat, Final",
         end="Functions",
     )
     shed.def_(
@@ -0,0 +1,155 @@
+"""
+Opt-in memory profiling of a generation run with `tracemalloc`, see `main.py`'s `--profile-memory`;
+for holding a memory budget in CI, e.g. on small runners.
+
+For each module generated it records:
+
+  1. The traced memory at the start and end of its generator, and the peak whilst it ran
+    (in its worker process, if running in parallel).
+  2. The top allocation sites (lines), by size, in `FILES`, e.g. `rst.py`'s reading of the `.rst` files
+    and `pyi.py`'s rendering; sampled after each `.rst` file is read and as each file is written
+    (when the whole module has been parsed), each site reported with its largest size in any sample (`sample`).
+
+The report, `MemoryProfile.write_json`, is JSON.
+Only memory allocated by Python is traced, and tracing slows the run several fold.
+Profiling is enabled by `start`, when not (the default) the cost is a test per file written.
+"""
+
+import json
+import os
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, Tuple, List, Optional, Final, Any
+
+import rst
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+FILES: Final[Tuple[str, ...]] = ("rst.py", "rst2pyi.py", "pyi.py", "class_.py")
+"""
+The files whose allocation sites are reported.
+"""
+
+_here: Final = os.path.dirname(os.path.abspath(__file__))
+
+_FILTERS: Final = [
+    tracemalloc.Filter(True, os.path.join(_here, file_name)) for file_name in FILES
+]
+
+
+@dataclass
+class MemoryProfile:
+    """
+    The memory used generating each module, `modules`, with the `top` allocation sites per file in `FILES`.
+    """
+
+    modules: List[Dict[str, Any]] = field(default_factory=list)
+    top: int = 10
+    _module: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    _sites: Dict[Tuple[str, int], Tuple[int, int]] = field(
+        default_factory=dict, repr=False
+    )  # File and line to the largest size and its count.
+
+    def begin(self, module: str, output_root_dir: str) -> None:
+        """
+        Start recording `module`, being generated into `output_root_dir`.
+        """
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        self._module = {
+            "module": module,
+            "output_root_dir": output_root_dir,
+            "start_bytes": start,
+            "peak_bytes": start,
+            "end_bytes": start,
+            "sites": {},
+        }
+        self._sites.clear()
+
+    def sample(self) -> None:
+        """
+        Sample the allocation sites of the module being recorded, keeping the largest size of each site in `FILES`.
+        The peak is read before sampling, since the sample itself allocates.
+        """
+        module = self._module
+        if module is None:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        module["peak_bytes"] = max(module["peak_bytes"], peak)
+        statistics = tracemalloc.take_snapshot().filter_traces(_FILTERS).statistics("lineno")
+        sites = self._sites
+        for statistic in statistics:
+            frame = statistic.traceback[0]
+            site = os.path.basename(frame.filename), frame.lineno
+            if statistic.size > sites.get(site, (0, 0))[0]:
+                sites[site] = statistic.size, statistic.count
+        del statistics
+        tracemalloc.reset_peak()  # Forget the sample's own allocations.
+
+    def end(self) -> None:
+        """
+        Finish recording the module.
+        """
+        module = self._module
+        if module is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        module["peak_bytes"] = max(module["peak_bytes"], peak)
+        module["end_bytes"] = current
+        sites: Dict[str, List[Dict[str, Any]]] = {}
+        by_size = sorted(self._sites.items(), key=lambda item: item[1], reverse=True)
+        for (file_name, line), (size, count) in by_size:
+            file_sites = sites.setdefault(file_name, [])
+            if len(file_sites) < self.top:
+                file_sites.append({"line": line, "size_bytes": size, "count": count})
+        module["sites"] = sites
+        self._sites.clear()
+        self.modules.append(module)
+        self._module = None
+
+    def merge(self, other: "MemoryProfile") -> None:
+        self.modules += other.modules
+
+    def peak(self) -> Optional[Dict[str, Any]]:
+        """
+        The module with the highest peak, if any.
+        """
+        return max(self.modules, key=lambda module: module["peak_bytes"], default=None)
+
+    def write_json(self, path: str) -> None:
+        peak = self.peak()
+        report = {
+            "peak_bytes": 0 if peak is None else peak["peak_bytes"],
+            "modules": sorted(
+                self.modules, key=lambda module: module["peak_bytes"], reverse=True
+            ),
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+
+
+profile: Optional[MemoryProfile] = None
+"""
+The active `MemoryProfile`, if any; set with `start`.
+"""
+
+
+def start(active: MemoryProfile) -> None:
+    """
+    Start tracing memory, recording into `active`.
+    """
+    global profile
+    profile = active
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def sample() -> None:
+    """
+    Sample the allocation sites, see `MemoryProfile.sample`, if profiling.
+    """
+    if profile is not None:
+        profile.sample()
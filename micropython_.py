@@ -16,8 +16,6 @@ def micropython(shed: RST2PyI) -> None:
         name="micropython",
         old="access and control MicroPython internals",
         post_doc=f'''
-from typing import TypeVar, overload, Callable, Any, Final
-
 _T: Final = TypeVar('_T')
 _F: Final = TypeVar("_F", bound=Callable[..., Any])
 
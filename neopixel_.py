@@ -16,8 +16,6 @@ def neopixel(shed: RST2PyI) -> None:
         name=r"neopixel",
         old="control of WS2812 / NeoPixel LEDs",
         post_doc="""
-from typing import Final
-
 from machine import Pin
 
 _Color: Final = tuple[int, int, int] | tuple[int, int, int, int]
@@ -263,9 +263,6 @@ def _network(shed: RST2PyI) -> None:
         name="network",
         old="network configuration",
         post_doc='''
-from abc import abstractmethod
-from typing import Protocol, Callable, overload, Any, ClassVar, Final
-
 import pyb
 
 
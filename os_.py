@@ -17,9 +17,6 @@ def os(shed: RST2PyI) -> None:
         name="os",
         old='basic "operating system" services',
         post_doc=f'''
-from abc import abstractmethod
-from typing import Final, TypeVar, runtime_checkable, Protocol, overload, Literal
-
 from uio import IOBase
 
 _StrOrBytesT: Final = TypeVar('_StrOrBytesT', str, bytes)
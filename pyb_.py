@@ -2187,12 +2187,6 @@ def _pyb(shed: RST2PyI) -> None:
         name="pyb",
         old="functions related to the board",
         post_doc=f'''
-from abc import ABC, abstractmethod
-from typing import NoReturn, overload, Sequence, runtime_checkable, Protocol
-from typing import Callable, Dict, Any, ClassVar, Final
-
-from uarray import array
-from uio import AnyReadableBuf, AnyWritableBuf
 from uos import AbstractBlockDev
 
 @runtime_checkable
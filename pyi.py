@@ -3,10 +3,11 @@ Minimal concept of a typeshed file (module), just enough to model the modules as
 """
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Iterator, TextIO
 
 import rst
-from class_ import Class, strip_leading_and_trailing_blank_lines
+from timing import timed
+from class_ import Class, joined_chunks
 
 __author__ = rst.__author__
 __copyright_ = rst.__copyright__
@@ -20,22 +21,42 @@ class PYI:
     imports_vars_defs: List[str] = field(default_factory=list)
     classes: List[Class] = field(default_factory=list)
 
+    @timed("render")
     def __str__(self) -> str:
-        new_line = "\n"  # Can't have `\` inside `{}` in an f-string!
-        return (
-            f'''
-"""
-{new_line.join(strip_leading_and_trailing_blank_lines(self.doc))}
-"""
+        return "".join(self.iter_chunks())
+
+    def iter_chunks(self) -> Iterator[str]:
+        """
+        The text of the typeshed in chunks, which concatenated are `str(self)`, see `write_to`.
+        """
+        pending: List[str] = []  # Trailing new lines, which are only written if followed by text.
+        for chunk in self._unstripped_chunks():
+            text = chunk.rstrip("\n")
+            if text:
+                yield from pending
+                yield text
+                pending = [chunk[len(text) :]]
+            else:
+                pending.append(chunk)
+        yield "\n"
 
-{new_line.join(strip_leading_and_trailing_blank_lines(self.imports_vars_defs))}
+    def _unstripped_chunks(self) -> Iterator[str]:
+        yield '"""\n'
+        yield from joined_chunks(self.doc)
+        yield '\n"""\n\n'
+        yield from joined_chunks(self.imports_vars_defs)
+        yield "\n\n"
+        for index, class_ in enumerate(self.classes):
+            if index:
+                yield "\n"
+            yield from class_.iter_chunks()
+        yield "\n"
 
-{new_line.join((str(class_) for class_ in self.classes))}
-'''.strip(
-                new_line
-            )
-            + "\n"
-        )
+    def write_to(self, stream: TextIO) -> None:
+        """
+        Write the typeshed to `stream` in chunks, rather than building the whole text first as `str` does.
+        """
+        stream.writelines(self.iter_chunks())
 
     def clear(self):
         self.doc.clear()
@@ -17,8 +17,6 @@ def random(shed: RST2PyI) -> None:
         name="random",
         old="random numbers",
         post_doc='''
-from typing import TypeVar, runtime_checkable, Protocol, overload
-
 _T = TypeVar('_T')
 
 @runtime_checkable
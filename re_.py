@@ -17,8 +17,6 @@ def re(shed: RST2PyI) -> None:
         name="re",
         old="regular expressions",
         post_doc=f"""
-from typing import AnyStr, Callable, Generic, Final, Any
-
 _StrLike: Final = str | bytes
 """,
         end="Functions",
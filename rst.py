@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Iterator, List, Final, Union
+from hashlib import sha256
+from typing import Iterator, List, Final, Union, Callable, Dict, Optional
 from urllib.request import urlopen, Request
 
 __author__ = "Howard C Lovatt"
@@ -7,6 +8,51 @@ __copyright__ = "Howard C Lovatt, 2020 onwards."
 __license__ = "MIT https://opensource.org/licenses/MIT (as used by MicroPython)."
 __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
 
+Fetch = Callable[[Union[str, Request]], bytes]
+"""
+Type of functions that return the contents of a URL, see `fetch_url` and module `fetch`.
+"""
+
+counts: Optional[Dict[str, int]] = None
+"""
+The counts of the work done by `RST`, e.g. lines `popped`, for the current generator function if counting;
+see module `counting`, which sets it.
+"""
+
+
+def fetch_url(url: Union[str, Request]) -> bytes:
+    """
+    The default `Fetch` for `RST.push_url`; a plain `urlopen`.
+    """
+    with urlopen(url) as f:
+        return f.read()
+
+
+@dataclass
+class _File:
+    """
+    A `push_url`ed file: its `lines` and the index of the `next` line.
+    Reading a line moves `next` on, rather than removing the line, so pushing it back moves `next` back.
+    """
+
+    lines: List[str]
+    next: int = 0
+
+    @staticmethod
+    def from_text(text: str) -> "_File":
+        """
+        Split `text` into lines like `bytes.splitlines`, i.e. on `\\r\\n`, `\\r`, or `\\n` only.
+        """
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        lines = text.split("\n")
+        if not lines[-1]:
+            lines.pop()  # Empty after the last line end, or `text` is empty.
+        return _File(lines=lines)
+
+    def __len__(self) -> int:
+        return len(self.lines) - self.next
+
 
 @dataclass(frozen=True)
 class RST(Iterator[str]):
@@ -18,45 +64,94 @@ class RST(Iterator[str]):
     `__len__` is provided and is typically use to test if empty, via implicit bool conversion.
     `peek` is useful for debugging parsers.
     `pop_line` and `pop_lines` are useful for fixing up `rst` files to make them easier to parse.
+    `fetch` reads the files for `push_url`, see module `fetch` for alternatives, e.g. prefetched or cached.
+    `sources` records the SHA-256 of each `push_url`ed file (for incremental builds, see module `manifest`).
+
+    Internally the stack is of frames; a `push_url`ed file is a `_File`, read via a cursor,
+    and `push_line`d lines are a list (reversed).
+    Pushing back the line just read from a `_File` moves its cursor back rather than adding a frame.
     """
 
-    _lines: Final[List[str]] = field(default_factory=list)
+    _frames: Final[List[Union[_File, List[str]]]] = field(default_factory=list)
+    fetch: Fetch = fetch_url
+    sources: Final[Dict[str, str]] = field(default_factory=dict)
 
     def __iter__(self) -> "RST":
         return self
 
     def __next__(self) -> str:
-        if not self._lines:
-            # Should really (`Iterator` contract) remember that it has stopped and then stay stopped;
-            # but it doesn't, in fact it does the opposite and is reused via `Typeshed` instance for the next module!
-            raise StopIteration
-        return self._lines.pop()
+        frames = self._frames
+        while frames:
+            top = frames[-1]
+            if isinstance(top, _File):
+                index = top.next
+                lines = top.lines
+                if index < len(lines):
+                    top.next = index + 1
+                    if counts is not None:
+                        counts["popped"] += 1
+                    return lines[index]
+            elif top:
+                if counts is not None:
+                    counts["popped"] += 1
+                return top.pop()
+            frames.pop()
+        # Should really (`Iterator` contract) remember that it has stopped and then stay stopped;
+        # but it doesn't, in fact it does the opposite and is reused via `Typeshed` instance for the next module!
+        raise StopIteration
 
     def __len__(self) -> int:
-        return len(self._lines)
+        return sum(len(frame) for frame in self._frames)
+
+    def __repr__(self) -> str:
+        lines: List[str] = []
+        for frame in reversed(self._frames):
+            if isinstance(frame, _File):
+                lines.extend(frame.lines[frame.next :])
+            else:
+                lines.extend(reversed(frame))
+        return f"RST(lines={lines!r})"
 
     def push_line(self, line: str) -> None:
-        self._lines.append(line)
+        if counts is not None:
+            counts["pushed_back"] += 1
+        frames = self._frames
+        if frames:
+            top = frames[-1]
+            if isinstance(top, _File):
+                if top.next > 0 and top.lines[top.next - 1] == line:
+                    top.next -= 1  # Push back of the line just read.
+                    return
+            else:
+                top.append(line)
+                return
+        frames.append([line])
 
     def push_lines(self, *, lines: List[str]) -> None:
-        self._lines.extend(reversed(lines))
+        if counts is not None:
+            counts["pushed_back"] += len(lines)
+        self._frames.append(list(reversed(lines)))
 
     def push_url(self, url: Union[str, Request]) -> None:
-        with urlopen(url) as f:
-            lines = f.read().splitlines()
-        for line in reversed(lines):
-            self._lines.append(line.decode())
+        content = self.fetch(url)
+        if isinstance(url, str):
+            self.sources[url] = sha256(content).hexdigest()
+        if counts is not None:
+            counts["decoded_bytes"] += len(content)
+        self._frames.append(_File.from_text(content.decode()))
 
     def peek(self) -> str:
-        if not self._lines:
+        line = next(self, None)
+        if line is None:
             return "No more lines!"
-        return self._lines[-1]
+        self.push_line(line)
+        return line
 
     def pop_line(self) -> str:
-        return self._lines.pop()
+        line = next(self, None)
+        if line is None:
+            raise IndexError("pop from empty RST")
+        return line
 
     def pop_lines(self, *, num_lines: int) -> List[str]:
-        lines: List[str] = []
-        for _ in range(num_lines):
-            lines.append(self._lines.pop())
-        return lines
+        return [self.pop_line() for _ in range(num_lines)]
@@ -2,13 +2,23 @@
 Routines to converts `.rst` documentation files into `.pyi` typeshed stub interfaces.
 """
 import os
-from dataclasses import dataclass
-from typing import List, Set, Dict, Callable, Optional, ClassVar, Union
+from dataclasses import dataclass, field
+from typing import List, Set, Dict, Callable, Optional, ClassVar, Union, Any, Iterable
 
+import memory
 import rst
 from class_ import Class
+from fetch import LocalDocs
+from imports import add_imports, aliases_pyi, ALIASES
+from journal import Journal
+from manifest import hash_file
+from slim import strip_docstrings
 from pyi import PYI
+from split import split
 from rst import RST
+from timing import timed, timed_iter, section
+from tracing import traced, tag
+from counting import counted, consumed
 
 __author__ = rst.__author__
 __copyright__ = rst.__copyright__
@@ -33,16 +43,55 @@ class RST2PyI:
       9. Repeat 2 to 8 for each module.
 
     A simple example of using `RST2PyI` is `array_.py` and a complicated example is `pyb_.py`.
+
+    If `docs_dir` is given, the `.rst` files are read from it rather than fetched from `input_base_url`;
+    it is a local checkout of MicroPython's `docs/library` directory.
+
+    `written` lists the files written, relative to `output_root_dir`,
+    and `changed` those of them whose content changed (a file is only replaced if its content changed).
+
+    If `journal_dir` is given, each module's declarations are journaled in it as `<module name>.json`,
+    so that the module can be `replay`ed without its `.rst` files, see module `journal`.
+    The declarations record their results via `_journaled`.
+
+    `u_mode`, one of `U_MODES`, is how `write(u_also=True)` writes `u<name>.pyi`:
+    a `copy` of `<name>.pyi`, a `reexport` stub (`from <name> import *`),
+    or a `symlink` to `<name>.pyi` (a `reexport` stub if symbolic links aren't supported).
+
+    If `slim_dir` is given, each module is also written to it without docstrings, see module `slim`.
+
+    The modules named in `packages` are written as packages, `<name>/__init__.pyi`,
+    with each class from its own `.rst` file (`class_from_file`) in a submodule, see module `split`;
+    their public names are the same as if written as `<name>.pyi`.
+
+    The `.rst` files are fetched from `input_base_url` (default `_input_base_url`, MicroPython's `master` docs),
+    e.g. `versioned_base_url("v1.19")` for a release's docs.
+    A written file that is identical to the corresponding file in `link_dirs[<directory written to>]`,
+    e.g. the previous release's output directory, is hard linked to it rather than written.
+
+    The imports of the names a module uses from `typing`, `_aliases`, etc. are added when it is written,
+    see module `imports`; `_aliases.pyi` is written along with the modules that import from it.
     """
 
     output_root_dir: str
+    docs_dir: str = ""
     _name: str = ""
-    pyi: PYI = PYI()
-    rst: RST = RST()
-
-    _input_base_url: ClassVar[
+    pyi: PYI = field(default_factory=PYI)
+    rst: RST = field(default_factory=RST)
+    written: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    journal_dir: str = ""
+    _journal: Optional[Journal] = None
+    u_mode: str = "copy"
+    slim_dir: str = ""
+    packages: List[str] = field(default_factory=list)
+    input_base_url: str = ""
+    link_dirs: Dict[str, str] = field(default_factory=dict)
+
+    _input_base_url_format: ClassVar[
         str
-    ] = r"https://raw.githubusercontent.com/micropython/micropython/master/docs/library/"
+    ] = r"https://raw.githubusercontent.com/micropython/micropython/{version}/docs/library/"
+    _input_base_url: ClassVar[str] = _input_base_url_format.format(version="master")
     _equals_char: ClassVar[Set[str]] = set("=")
     _minus_char: ClassVar[Set[str]] = set("-")
     _tilde_char: ClassVar[Set[str]] = set("~")
@@ -52,6 +101,55 @@ class RST2PyI:
     _admonition: ClassVar[str] = ".. admonition::"
     _data_dec_str: ClassVar[str] = ".. data:: "
     _data_dec_parts: ClassVar[List[str]] = _data_dec_str.split()
+    U_MODES: ClassVar[List[str]] = ["copy", "reexport", "symlink"]
+
+    def __post_init__(self) -> None:
+        assert self.u_mode in RST2PyI.U_MODES, f"Unknown `u_mode`, `{self.u_mode}`!"
+        if not self.input_base_url:
+            self.input_base_url = RST2PyI._input_base_url
+        if self.docs_dir:
+            self.rst = RST(
+                fetch=LocalDocs(directory=self.docs_dir, base_url=self.input_base_url)
+            )
+
+    @staticmethod
+    def versioned_base_url(version: str) -> str:
+        """
+        The URL of the `.rst` files of `version` (a tag, branch, or commit) of MicroPython's docs.
+        """
+        return RST2PyI._input_base_url_format.format(version=version)
+
+    @timed("fetch")
+    @traced("fetch")
+    def _push_url(self, url: str) -> None:
+        self.rst.push_url(url)
+        memory.sample()  # Whilst the file's lines are all held.
+
+    def _journaled(self, op: str, **args: Any) -> None:
+        """
+        Add the result of a declaration to `pyi`, via `_add_<op>(**args)`, journaling it if journaling.
+        """
+        journal = self._journal
+        if journal is not None:
+            journal.sync(self.pyi)
+            copied = {k: list(v) if isinstance(v, list) else v for k, v in args.items()}
+            journal.entries.append([op, copied])
+        getattr(self, "_add_" + op)(**args)
+        if journal is not None:
+            journal.seen(self.pyi)
+
+    @timed("parse")
+    def replay(self, path: str) -> None:
+        """
+        Rebuild, and `write`, the module journaled in `path` (see `journal_dir`); reads no `.rst` files.
+        """
+        for op, args in Journal.load(path).entries:
+            if op == "write":
+                self.write(**args)
+            elif op.startswith("pyi_"):
+                Journal.redo(self.pyi, op, args)
+            else:
+                self._journaled(op, **args)
 
     @staticmethod
     def _filter_out_data_dec_and_etc(names: Union[str, List[str]]) -> List[str]:
@@ -99,6 +197,9 @@ class RST2PyI:
         :param end: The line to test for (if `None` returns false).
         :return: True if `line` is `end` line.
         """
+        counts = rst.counts
+        if counts is not None:
+            counts["is_end"] += 1
         if end is None:
             return False
         s_line = line.lstrip()
@@ -109,6 +210,8 @@ class RST2PyI:
             return True
         return False
 
+    @timed("scan")
+    @counted
     def consume_line(
         self,
         test: Callable[[str], bool],
@@ -117,19 +220,21 @@ class RST2PyI:
         and_preceding_lines: bool = False,
     ) -> None:
         if and_preceding_lines:
-            for line in self.rst:
+            for skipped, line in enumerate(self.rst):
                 if test(line):
                     break
             else:
                 assert (
                     False
                 ), f"Expected `{msg}`, but reached end-of-file before finding it!"
+            consumed(skipped)
         else:
             line = next(self.rst, None)
             assert (
                 line is not None
             ), f"`Expected {msg}`, but reached end-of-file before finding it!"
             assert test(line), f"Expected {msg}, got `{line}`!"
+            consumed(0)
 
     def consume_blank_line(self, *, and_preceding_lines: bool = False) -> None:
         self.consume_line(
@@ -174,6 +279,7 @@ class RST2PyI:
             and_preceding_lines=and_preceding_lines,
         )
 
+    @counted
     def consume_containing_line(
         self, string: str, *, and_preceding_lines: bool = False
     ) -> None:
@@ -181,6 +287,9 @@ class RST2PyI:
             lambda l: string in l, msg=string, and_preceding_lines=and_preceding_lines,
         )
 
+    @timed("parse")
+    @traced("declaration")
+    @counted
     def module(
         self,
         *,
@@ -191,8 +300,12 @@ class RST2PyI:
         end: str,
     ) -> None:
         self._name = name
-        url = RST2PyI._input_base_url + name + ".rst"
-        self.rst.push_url(url)
+        if self.journal_dir:
+            self._journal = Journal()
+        section(module=name, source=name + ".rst")
+        tag(module=name, source=name + ".rst", class_name="")
+        url = self.input_base_url + name + ".rst"
+        self._push_url(url)
         self.consume_containing_line(
             string=old, and_preceding_lines=True,
         )
@@ -205,6 +318,14 @@ class RST2PyI:
             doc.append(doc_line)
         else:
             assert False, f"`end` line, `{end}`, not found!"
+        self._journaled(
+            "module", name=name, new=new, url=url, doc=doc, post_doc=post_doc
+        )
+
+    def _add_module(
+        self, *, name: str, new: str, url: str, doc: List[str], post_doc: str
+    ) -> None:
+        self._name = name
         self.pyi.doc.append(
             f"""
 {new}.
@@ -220,12 +341,16 @@ __author__ = "{rst.__author__}"
 __copyright__ = "{rst.__copyright__}"
 __license__ = "{rst.__license__}"
 __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
-
-{post_doc.strip()}
 """.strip()
         )
+        # Separately, so that `add_imports` can add the imports in between.
+        if post_doc.strip():
+            self.pyi.imports_vars_defs.append("\n" + post_doc.strip())
         self.pyi.imports_vars_defs.append("\n")
 
+    @timed("parse")
+    @traced("declaration")
+    @counted
     def class_from_file(
         self,
         *,
@@ -238,8 +363,10 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
     ) -> None:
         line = next(iter(self.rst))
         assert line.lstrip().startswith(old), f"Did not find: `{old}`, found `{line}`!"
-        url = RST2PyI._input_base_url + old.strip()
-        self.rst.push_url(url)
+        section(module=self._name, source=old.strip())
+        tag(source=old.strip())
+        url = self.input_base_url + old.strip()
+        self._push_url(url)
         rst_file_name = old[old.find(".") + 1 :]
         class_name = rst_file_name[: rst_file_name.find(".")]
         if super_class is not None:
@@ -266,12 +393,18 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
         if extra_docs:
             new_line = "\n"  # Can't have `\n` in between `{}` in f-string.
             doc.append(f"\n   {new_line.join(extra_docs)}")
-        new_class = Class(pre_str=pre_str)
-        self.pyi.classes.append(new_class)
-        new_class.class_def = f"class {class_name}:"
-        new_class.doc = doc
-        new_class.imports_vars.append(post_doc)
+        self._journaled(
+            "class",
+            pre_str=pre_str,
+            class_def=f"class {class_name}:",
+            doc=doc,
+            post_doc=post_doc,
+            source=old.strip(),
+        )
 
+    @timed("parse")
+    @traced("declaration")
+    @counted
     def class_(
         self,
         *,
@@ -281,14 +414,36 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
         post_doc: str = "",
         end: Optional[str],
     ) -> None:
-        new_class = Class(pre_str=pre_str)
-        self.pyi.classes.append(new_class)
-        new_class.class_def = f"class {name}:"
-        new_class.doc = self.extra_notes(end=end, first_line="")
+        doc = self.extra_notes(end=end, first_line="")
         if extra_docs:
-            new_class.doc += extra_docs
+            doc += extra_docs
+        self._journaled(
+            "class",
+            pre_str=pre_str,
+            class_def=f"class {name}:",
+            doc=doc,
+            post_doc=post_doc,
+        )
+
+    def _add_class(
+        self,
+        *,
+        pre_str: str,
+        class_def: str,
+        doc: List[str],
+        post_doc: str,
+        source: str = "",
+    ) -> None:
+        new_class = Class(pre_str=pre_str, source=source)
+        self.pyi.classes.append(new_class)
+        tag(class_name=class_def[len("class ") :].split("(")[0].rstrip(":"))
+        new_class.class_def = class_def
+        new_class.doc = doc
         new_class.imports_vars.append(post_doc)
 
+    @timed("parse")
+    @traced("declaration")
+    @counted
     def defs_with_common_description(
         self,
         *,
@@ -335,11 +490,20 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
         else:
             assert doc, "No description found!"
         for new in new_defs:
-            self._add_def_or_defs(
-                method_def, doc, indent, extra_doc_indent, new, pre_str
+            self._journaled(
+                "def_or_defs",
+                method_def=method_def,
+                doc=doc,
+                indent=indent,
+                extra_doc_indent=extra_doc_indent,
+                new=new,
+                pre_str=pre_str,
             )
         assert new_defs, "No defs found!"
 
+    @timed("parse")
+    @traced("declaration")
+    @counted
     def def_(
         self,
         *,
@@ -383,10 +547,19 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
             assert doc, f"No documentation found before end-of-file reached!"
         doc.extend(extra_docs)
         assert doc, f"No documentation found before `{end}` reached!"
-        self._add_def_or_defs(method_def, doc, indent, extra_doc_indent, new, pre_str)
+        self._journaled(
+            "def_or_defs",
+            method_def=method_def,
+            doc=doc,
+            indent=indent,
+            extra_doc_indent=extra_doc_indent,
+            new=new,
+            pre_str=pre_str,
+        )
 
     def _add_def_or_defs(
         self,
+        *,
         method_def: bool,
         doc: List[str],
         indent: int,
@@ -464,6 +637,8 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
         assert extras, f"No extra {description} before `{end}` reached!"
         return extras
 
+    @timed("parse")
+    @counted
     def extra_docs(
         self, *, indent: int = 3, end: Optional[str] = _definitions
     ) -> List[str]:
@@ -471,6 +646,8 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
             description="documentation", indent=indent, end=end, first_line=""
         )
 
+    @timed("parse")
+    @counted
     def extra_notes(
         self, *, end: Optional[str], first_line: str = "   \n"
     ) -> List[str]:
@@ -478,6 +655,9 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
             description="notes", indent=3, end=end, first_line=first_line
         )
 
+    @timed("parse")
+    @traced("declaration")
+    @counted
     def vars(
         self,
         *,
@@ -555,42 +735,228 @@ __version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
                 assert documentation, "No documentation found!"
             for extra_doc in extra_docs:
                 documentation.append(f"{indent_str}{extra_doc}")
-            documentation_str = "\n".join(documentation).strip()
-            declarations: List[str] = []
-            for var_name in names:
-                declarations.append(
-                    f'''
+            self._journaled(
+                "vars",
+                names=names,
+                type_hint=type_hint,
+                class_var=class_var,
+                documentation=documentation,
+            )
+            break  # Declaration finished.
+        else:
+            assert end is None, "No variable(s) found and end of file reached!"
+
+    def _add_vars(
+        self,
+        *,
+        names: List[str],
+        type_hint: str,
+        class_var: Optional[bool],
+        documentation: List[str],
+    ) -> None:
+        indent_str = " " * (0 if class_var is None else 3)
+        documentation_str = "\n".join(documentation).strip()
+        declarations: List[str] = []
+        for var_name in names:
+            declarations.append(
+                f'''
 {indent_str}{var_name}: {type_hint} = ...
 {indent_str}"""
 {documentation_str}
 {indent_str}"""
 '''
-                )
-            declaration_str = "\n".join(declarations) + "\n\n"
-            if class_var is None:  # Module level.
-                self.pyi.imports_vars_defs.append(declaration_str)
-            else:
-                self.pyi.classes[-1].imports_vars.append(declaration_str)
-            break  # Declaration finished.
+            )
+        declaration_str = "\n".join(declarations) + "\n\n"
+        if class_var is None:  # Module level.
+            self.pyi.imports_vars_defs.append(declaration_str)
         else:
-            assert end is None, "No variable(s) found and end of file reached!"
+            self.pyi.classes[-1].imports_vars.append(declaration_str)
 
     def preview(self) -> None:
         print(self.pyi)
 
+    @timed("write")
+    @traced("write")
     def write(self, *, u_also: bool = False) -> None:
         """
         Write the module to the output directory as `<self.name>.pyi` and reset `self` for next module.
-        If `u_also` is true, writes an additional identical file to `u<self.name>.pyi`.
+        If `u_also` is true, writes an additional identical file to `u<self.name>.pyi`, see `u_mode`.
+        Also writes the slim module, if `slim_dir` is given.
+        A module in `packages` is written as package `<self.name>/` instead, with a re-export stub as its `u` module.
+        A module that isn't valid Python, e.g. from a bad `new` signature, is written whole (not as a package)
+        and its slim module with the docstrings, so that validation reports the generator's line, see `validate.py`.
         """
         assert not self.rst, f"Not all input lines processed! Remaining: {self.rst}"
-        str_pyi = str(self.pyi)
-        with open(os.path.join(self.output_root_dir, self._name + ".pyi"), "w") as f:
-            f.write(str_pyi)
-        if u_also:
-            with open(
-                os.path.join(self.output_root_dir, "u" + self._name + ".pyi"), "w"
-            ) as f:
-                f.write(str_pyi)
+        journal = self._journal
+        if journal is not None:
+            journal.sync(self.pyi)
+            journal.entries.append(["write", {"u_also": u_also}])
+            journal.save(os.path.join(self.journal_dir, self._name + ".json"))
+            self._journal = None
+        section(module=self._name, source=self._name + ".pyi")
+        tag(source=self._name + ".pyi")
+        package = self._name in self.packages
+        files = {self._name + ".pyi": self.pyi}
+        if package:
+            try:
+                files = split(self.pyi, self._name)
+            except SyntaxError:  # Reported by validation.
+                package = False
+        imported_from = set()
+        for pyi in files.values():
+            imported_from |= add_imports(pyi)
+        copy_u = u_also and self.u_mode == "copy" and not package
+        directories = [self.output_root_dir]
+        if self.slim_dir:
+            directories.append(self.slim_dir)
+        self._write_files(files, directories, copy_u)
+        if ALIASES in imported_from:
+            self._write_files({ALIASES + ".pyi": aliases_pyi()}, directories, False)
+        for directory in directories:
+            self._remove_other_layout(directory, files)
+            if u_also and not copy_u:
+                self.write_u_alias(self._name, directory)
         self._name = ""
         self.pyi.clear()
+
+    def _write_files(
+        self, files: Dict[str, PYI], directories: List[str], copy_u: bool
+    ) -> None:
+        """
+        Write `files`, by file name, to each of `directories`, the output directory and the slim directory (if any);
+        and if `copy_u` a copy of each to `u<file name>`.
+        """
+        for file_name, pyi in files.items():
+            # Stream the text, rather than build it, unless it is needed whole for the slim module.
+            chunks = timed_iter("render", pyi.iter_chunks())
+            if self.slim_dir:
+                text = "".join(chunks)
+                try:
+                    slim = strip_docstrings(text)
+                except SyntaxError:  # Reported by validation.
+                    slim = text
+                texts: List[Iterable[str]] = [[text], [slim]]
+            else:
+                texts = [chunks]
+            memory.sample()
+            for directory, chunks in zip(directories, texts):
+                if copy_u:
+                    chunks = list(chunks)  # Written twice, keep the chunks (mostly `pyi`'s own strings).
+                self._write_if_changed(directory, file_name, chunks)
+                if copy_u:
+                    self._write_if_changed(directory, "u" + file_name, chunks)
+
+    def _remove_other_layout(self, directory: str, files: Dict[str, PYI]) -> None:
+        """
+        Remove, from `directory`, the stubs of the module just written as `files` that are from a previous layout,
+        e.g. `<name>.pyi` if now a package, or submodules no longer in the package;
+        a type checker would otherwise find both `<name>.pyi` and `<name>/__init__.pyi`.
+        """
+        single = self._name + ".pyi"
+        if single not in files and os.path.isfile(os.path.join(directory, single)):
+            os.remove(os.path.join(directory, single))
+        package_dir = os.path.join(directory, self._name)
+        if not os.path.isdir(package_dir):
+            return
+        for file_name in os.listdir(package_dir):
+            if file_name.endswith(".pyi") and f"{self._name}/{file_name}" not in files:
+                os.remove(os.path.join(package_dir, file_name))
+        if not os.listdir(package_dir):
+            os.rmdir(package_dir)
+
+    def write_u_alias(self, name: str, directory: Optional[str] = None) -> None:
+        """
+        Write `u<name>.pyi` as an alias of `<name>.pyi`, a symbolic link or a re-export stub, see `u_mode`,
+        in `directory` (default `output_root_dir`).
+        """
+        if directory is None:
+            directory = self.output_root_dir
+        u_name = "u" + name + ".pyi"
+        if self.u_mode == "symlink" and name not in self.packages:
+            path = os.path.join(directory, u_name)
+            target = name + ".pyi"  # Relative, so that the output directory can be moved.
+            if os.path.islink(path) and os.readlink(path) == target:
+                self.written.append(self._relative(path))
+                return
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.symlink(target, temp_path)
+            except (OSError, NotImplementedError):
+                pass  # E.g. Windows without the privilege, use a re-export.
+            else:
+                os.replace(temp_path, path)
+                self.changed.append(self._relative(path))
+                self.written.append(self._relative(path))
+                return
+        self._write_if_changed(
+            directory,
+            u_name,
+            [
+                f'''"""
+Alias of module `{name}`, see `{name}.pyi`.
+"""
+
+from {name} import *
+'''
+            ],
+        )
+
+    def _relative(self, path: str) -> str:
+        """
+        `path` relative to `output_root_dir`, as in `written` and `changed`.
+        """
+        return os.path.relpath(path, self.output_root_dir)
+
+    def _write_if_changed(
+        self, directory: str, file_name: str, chunks: Iterable[str]
+    ) -> None:
+        """
+        Write `chunks` to a temporary file that atomically replaces `file_name`, in `directory`,
+        only if their contents differ;
+        so that unchanged files keep their modification times, which downstream caches (e.g. mypy's) depend upon.
+        If writing raises, the temporary files are removed and `file_name` is left as it was.
+        """
+        path = os.path.join(directory, file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)  # E.g. a package, see `packages`.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.writelines(chunks)  # May raise part way, e.g. from a generator's `assert`.
+            if RST2PyI._same_file_contents(path, temp_path):
+                os.remove(temp_path)
+                self.written.append(self._relative(path))
+                return
+            link_dir = self.link_dirs.get(directory)
+            if link_dir is not None:
+                previous = os.path.join(link_dir, file_name)
+                if RST2PyI._same_file_contents(previous, temp_path):
+                    link_path = temp_path + ".link"
+                    try:
+                        os.link(previous, link_path)
+                    except OSError:
+                        pass  # E.g. on another file system, keep the copy.
+                    else:
+                        try:
+                            os.replace(link_path, temp_path)
+                        except BaseException:
+                            os.remove(link_path)
+                            raise
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):  # Not if `open` itself failed.
+                os.remove(temp_path)
+            raise
+        self.changed.append(self._relative(path))
+        self.written.append(self._relative(path))
+
+    @staticmethod
+    def _same_file_contents(path: str, temp_path: str) -> bool:
+        """
+        True if `path` is a regular file with the same contents as `temp_path`.
+        """
+        return (
+            os.path.isfile(path)
+            and not os.path.islink(path)  # E.g. from `u_mode` `symlink`.
+            and os.path.getsize(path) == os.path.getsize(temp_path)
+            and hash_file(path) == hash_file(temp_path)
+        )
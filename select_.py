@@ -16,8 +16,6 @@ def select(shed: RST2PyI) -> None:
         name="select",
         old="wait for events on a set of streams",
         post_doc=f'''
-from typing import Iterable, Any, Final, Iterator
-
 from uio import IOBase
 
 POLLIN: Final[int] = ...
@@ -0,0 +1,70 @@
+"""
+Slim typesheds, without docstrings, for type checkers that don't show documentation (e.g. in CI);
+see `RST2PyI.slim_dir`.
+"""
+
+import ast
+from typing import List, Tuple, Dict
+
+import rst
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+
+def _is_docstring(statement: ast.stmt, lines: List[str]) -> bool:
+    """
+    True if `statement` is a string on lines of its own.
+    """
+    return (
+        isinstance(statement, ast.Expr)
+        and isinstance(statement.value, ast.Constant)
+        and isinstance(statement.value.value, str)
+        and not lines[statement.lineno - 1][: statement.col_offset].strip()
+        and not lines[statement.end_lineno - 1][statement.end_col_offset :].strip()
+    )
+
+
+def strip_docstrings(text: str) -> str:
+    """
+    `text`, a typeshed, without its docstrings; i.e. without the strings that are statements,
+    which are the module, class, def, and var docstrings (unless they share a line with code).
+    A body that was only a docstring becomes `...`.
+    Everything else, including blank lines, is unchanged.
+    """
+    # Split like `ast`, only on `\n` (rendered typesheds have no `\r`), not as `splitlines` does, e.g. on `\f`.
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    # First line (0 based) of a docstring to its end line and replacement.
+    replacements: Dict[int, Tuple[int, str]] = {}
+    bodies: List[List[ast.stmt]] = [ast.parse(text).body]
+    while bodies:
+        body = bodies.pop()
+        docstrings = [
+            statement for statement in body if _is_docstring(statement, lines)
+        ]
+        for statement in docstrings:
+            replacements[statement.lineno - 1] = (statement.end_lineno, "")
+        if docstrings and len(docstrings) == len(body):
+            first = body[0]
+            start = first.lineno - 1
+            indent = lines[start][: first.col_offset]
+            replacements[start] = (replacements[start][0], f"{indent}...\n")
+        for statement in body:
+            for field in ("body", "orelse", "finalbody"):
+                inner = getattr(statement, field, None)
+                if inner:
+                    bodies.append(inner)
+    slim: List[str] = []
+    index = 0
+    while index < len(lines):
+        replacement = replacements.get(index)
+        if replacement is None:
+            slim.append(lines[index])
+            index += 1
+        else:
+            index, new = replacement
+            slim.append(new)
+    return "".join(slim)
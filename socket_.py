@@ -18,10 +18,6 @@ def socket(shed: RST2PyI) -> None:
         name="socket",
         old="socket",
         post_doc=f"""
-from typing import Final, Any, Literal, overload
-
-from uio import AnyReadableBuf, AnyWritableBuf
-
 _Address: Final = tuple[str, int] | tuple[str, int, int, int] | str
 """,
         end="Functions",
@@ -0,0 +1,94 @@
+"""
+Split a module's typeshed into a package, see `RST2PyI.packages`:
+each class from its own `.rst` file (`RST2PyI.class_from_file`), along with any classes that follow it,
+goes into submodule `<name>/_<class name in lower case>.pyi`
+and `<name>/__init__.pyi` is the rest of the module plus re-exports of the submodules' classes;
+so the module's public names are unchanged.
+
+Each submodule has all the module's explicit imports (they are only type stubs, so unused imports cost little)
+and imports the names it uses that the module defines, from the package or the submodule that defines them;
+the imports from `typing` etc. are added to each file afterwards, see module `imports`.
+"""
+
+import ast
+from typing import Dict, List, Optional
+
+import rst
+from class_ import Class, strip_leading_and_trailing_blank_lines
+from imports import defined_names, used_names
+from pyi import PYI
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+
+def split(pyi: PYI, name: str) -> Dict[str, PYI]:
+    """
+    Module `name`'s typeshed, `pyi`, split into a package; the `PYI` of each file by file name,
+    relative to the output directory, e.g. `pyb/__init__.pyi` and `pyb/_pin.pyi`.
+    """
+    header = "\n".join(strip_leading_and_trailing_blank_lines(pyi.imports_vars_defs))
+    header_tree = ast.parse(header)
+    imports = [
+        ast.get_source_segment(header, node)
+        for node in header_tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    defined_by: Dict[str, str] = {
+        defined: "" for defined in defined_names(header_tree)
+    }  # Name to defining submodule, `""` for the package.
+
+    init_classes: List[Class] = []
+    sections: Dict[str, List[Class]] = {}  # Submodule to its classes.
+    section: Optional[List[Class]] = None
+    trees: Dict[str, ast.Module] = {}  # Submodule to its classes' code.
+    for class_ in pyi.classes:
+        tree = ast.parse("".join(class_.iter_chunks()))
+        (class_name,) = defined_names(tree)
+        if class_.source:
+            submodule = "_" + class_name.lower()
+            assert (
+                submodule not in sections
+            ), f"Two classes in `{name}` map to `{submodule}`!"
+            section = sections[submodule] = []
+            trees[submodule] = ast.Module(body=[], type_ignores=[])
+        if section is None:
+            init_classes.append(class_)
+            defined_by[class_name] = ""
+        else:
+            section.append(class_)
+            defined_by[class_name] = submodule
+            trees[submodule].body += tree.body
+
+    files: Dict[str, PYI] = {}
+    re_exports = []
+    for submodule, classes in sections.items():
+        class_names = [c for c, s in defined_by.items() if s == submodule]
+        re_exports.append(
+            f"from .{submodule} import "
+            + ", ".join(f"{c} as {c}" for c in class_names)
+        )
+        from_imports: Dict[str, List[str]] = {}
+        for used in sorted(used_names(trees[submodule])):
+            source = defined_by.get(used)
+            if source is not None and source != submodule:
+                from_imports.setdefault(source, []).append(used)
+        imports_vars_defs = ["\n".join(imports), ""]
+        for source, names in sorted(from_imports.items()):
+            imports_vars_defs.append(f"from .{source} import {', '.join(names)}")
+        files[f"{name}/{submodule}.pyi"] = PYI(
+            doc=[
+                f"Class(es) {', '.join(f'`{c}`' for c in class_names)} of module `{name}`, "
+                f"import them from `{name}`."
+            ],
+            imports_vars_defs=imports_vars_defs + ["\n"],
+            classes=classes,
+        )
+    files[f"{name}/__init__.pyi"] = PYI(
+        doc=list(pyi.doc),
+        imports_vars_defs=list(pyi.imports_vars_defs) + ["", *re_exports, "\n"],
+        classes=init_classes,
+    )
+    return files
@@ -18,9 +18,6 @@ def ssl(shed: RST2PyI) -> None:
         name="ssl",
         old="TLS/SSL wrapper for socket objects",
         post_doc=f"""
-from typing import Final
-
-from uio import StrOrBytesPath
 from usocket import Socket
 """,
         end="Functions",
@@ -18,8 +18,6 @@ def stm(shed: RST2PyI) -> None:
         name="stm",
         old="functionality specific to STM32 MCUs",
         post_doc='''
-from typing import Final
-
 # noinspection PyPep8Naming
 class mem:
     """
@@ -15,11 +15,6 @@ def struct(shed: RST2PyI) -> None:
     shed.module(
         name="struct",
         old="pack and unpack primitive data types",
-        post_doc="""
-from typing import Any
-
-from uio import AnyReadableBuf, AnyWritableBuf
-""",
         end="Functions",
     )
 
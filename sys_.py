@@ -16,8 +16,6 @@ def sys(shed: RST2PyI) -> None:
         name="sys",
         old="system specific functions",
         post_doc="""
-from typing import Callable, Final, Literal, NoReturn
-
 from uio import IOBase
 
 class Implementation(tuple[str, tuple[int, int, int], int]):
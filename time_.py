@@ -16,8 +16,6 @@ def time(shed: RST2PyI) -> None:
         name="time",
         old="time related functions",
         post_doc="""
-from typing import Final, TypeVar
-
 class _TicksMs:
    ...
 
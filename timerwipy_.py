@@ -17,7 +17,6 @@ def timer_wipy(shed: RST2PyI) -> None:
     shed.module(
         name="machine.TimerWiPy",
         old="class TimerWiPy -- control hardware timers",
-        post_doc="from typing import overload, ClassVar, Callable",
         end=constructors,
     )
 
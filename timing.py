@@ -0,0 +1,186 @@
+"""
+Opt-in timing of the phases of a generation run, per module and per source (`.rst` file) within the module;
+the writing of a module is attributed to its `.pyi` file.
+
+The phases are:
+
+  1. `fetch`: reading the `.rst` files, `RST.push_url`.
+  2. `scan`: searching for lines, `RST2PyI.consume_line`;
+    `RST2PyI.is_end`, which is called per line, isn't timed itself but is part of its caller's phase.
+  3. `parse`: the rest of the `RST2PyI` declarations, e.g. `def_`, not in one of the above.
+  4. `render`: converting to text, `PYI.__str__` and `Class.__str__`,
+    and producing the chunks of text that `RST2PyI.write` streams to the files, see `timed_iter`.
+  5. `write`: writing the `.pyi` files, `RST2PyI.write`, other than rendering them.
+  6. `validate`: checking the written `.pyi` files after the run, `validate.validate`.
+
+Phases nest, e.g. `scan` is inside `parse`, and time is attributed to the innermost phase only.
+Timing is enabled by setting `timings` to a `Timings`, when `None` (the default) the cost is a test per timed call;
+only calls made per declaration or per file are timed, not those made per line.
+"""
+
+import json
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Dict, Tuple, List, Optional, Callable, TypeVar, Final, Any, Iterable, Iterator
+
+import rst
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+PHASES: Final[Tuple[str, ...]] = (
+    "fetch",
+    "scan",
+    "parse",
+    "render",
+    "write",
+    "validate",
+)
+
+
+@dataclass
+class Timings:
+    """
+    Seconds per `(module, source)` per phase.
+    """
+
+    seconds: Dict[Tuple[str, str], Dict[str, float]] = field(default_factory=dict)
+    module: str = ""
+    source: str = ""
+    _stack: List[List[Any]] = field(default_factory=list, repr=False)
+
+    def section(self, *, module: str, source: str) -> None:
+        """
+        Attribute following phases to `source` (an `.rst` file) of `module`.
+        """
+        self.module = module
+        self.source = source
+
+    def _add(self, phase: str, seconds: float) -> None:
+        phases = self.seconds.setdefault((self.module, self.source), {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def enter(self, phase: str) -> None:
+        now = perf_counter()
+        if self._stack:  # Pause the enclosing phase.
+            outer = self._stack[-1]
+            self._add(outer[0], now - outer[1])
+        self._stack.append([phase, now])
+
+    def exit(self) -> None:
+        now = perf_counter()
+        phase, start = self._stack.pop()
+        self._add(phase, now - start)
+        if self._stack:  # Resume the enclosing phase.
+            self._stack[-1][1] = now
+
+    def merge(self, other: "Timings") -> None:
+        for key, phases in other.seconds.items():
+            merged = self.seconds.setdefault(key, {})
+            for phase, seconds in phases.items():
+                merged[phase] = merged.get(phase, 0.0) + seconds
+
+    def table(self) -> str:
+        """
+        The timings as a table, slowest first, with a total row.
+        """
+        rows = sorted(
+            self.seconds.items(), key=lambda item: sum(item[1].values()), reverse=True
+        )
+        names = [f"{module}/{source}" for (module, source), _ in rows]
+        name_width = max(len(name) for name in names + ["Module/source"])
+        lines = [
+            f"{'Module/source':<{name_width}} "
+            + " ".join(f"{phase:>8}" for phase in PHASES + ("total",))
+        ]
+        totals = {phase: 0.0 for phase in PHASES}
+        for name, (_, phases) in zip(names, rows):
+            for phase, seconds in phases.items():
+                totals[phase] += seconds
+            lines.append(Timings._row(name, name_width, phases))
+        lines.append(Timings._row("Total", name_width, totals))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _row(name: str, width: int, phases: Dict[str, float]) -> str:
+        cells = [phases.get(phase, 0.0) for phase in PHASES]
+        cells.append(sum(cells))
+        return f"{name:<{width}} " + " ".join(f"{cell:8.3f}" for cell in cells)
+
+    def write_json(self, path: str) -> None:
+        records = [
+            {"module": module, "source": source, **phases}
+            for (module, source), phases in sorted(self.seconds.items())
+        ]
+        with open(path, "w") as f:
+            json.dump(records, f, indent=1)
+
+
+timings: Optional[Timings] = None
+"""
+The active `Timings`, if any.
+"""
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def timed(phase: str) -> Callable[[_F], _F]:
+    """
+    Decorator that times calls of the decorated function as `phase` whilst `timings` is set.
+    """
+
+    def decorator(function: _F) -> _F:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            active = timings
+            if active is None:
+                return function(*args, **kwargs)
+            active.enter(phase)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                active.exit()
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+_T = TypeVar("_T")
+
+
+def timed_iter(phase: str, iterable: Iterable[_T]) -> Iterable[_T]:
+    """
+    `iterable`, with the time taken to produce each item timed as `phase` whilst `timings` is set,
+    e.g. lazily rendered text that is consumed whilst writing it.
+    """
+    active = timings
+    if active is None:
+        return iterable
+    return _timed_items(active, phase, iter(iterable))
+
+
+def _timed_items(active: Timings, phase: str, iterator: Iterator[_T]) -> Iterator[_T]:
+    while True:
+        active.enter(phase)
+        try:
+            item = next(iterator, _done)
+        finally:
+            active.exit()
+        if item is _done:
+            return
+        yield item  # type: ignore
+
+
+_done: Final = object()
+
+
+def section(*, module: str, source: str) -> None:
+    """
+    Attribute following phases to `source` of `module`, if `timings` is set.
+    """
+    if timings is not None:
+        timings.section(module=module, source=source)
@@ -0,0 +1,135 @@
+"""
+Opt-in tracing of a generation run as Chrome trace events, viewable offline in Perfetto (https://ui.perfetto.dev)
+or `chrome://tracing`, to see how the phases overlap when running in parallel (`main.py`'s `--jobs`),
+unlike `timing`'s totals.
+
+There are spans for:
+
+  1. Each `.rst` file read, `RST2PyI._push_url`.
+  2. Each declaration, e.g. `RST2PyI.def_`, `vars`, `class_from_file`, and `defs_with_common_description`.
+  3. Each `RST2PyI.write`.
+  4. Each generator run and each worker process's lifetime, see `main.py`.
+
+Spans are tagged with the module and class being generated (`tag`), and are nested by time (Chrome's `X` events).
+Tracing is enabled by setting `tracer` to a `Tracer`, when `None` (the default) the cost is a test per call.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict, List, Optional, Callable, TypeVar, Any
+
+import rst
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+
+def now() -> float:
+    """
+    The time in microseconds, as trace events need, from a clock shared by the worker processes.
+    """
+    return time.time_ns() / 1000
+
+
+@dataclass
+class Tracer:
+    """
+    The trace `events` of this process, and the `tags` given to the spans that end.
+    """
+
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    tags: Dict[str, str] = field(default_factory=dict)
+    started: float = field(default_factory=now)
+
+    def span(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        *,
+        end: Optional[float] = None,
+        pid: Optional[int] = None,
+        **args: Any,
+    ) -> None:
+        """
+        Add a span, `name`, from `start` to `end` (default now),
+        in `pid`'s main thread (default this process and thread).
+        """
+        if end is None:
+            end = now()
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": end - start,
+                "pid": os.getpid() if pid is None else pid,
+                "tid": threading.get_native_id() if pid is None else pid,
+                "args": {**self.tags, **args},
+            }
+        )
+
+    def name_process(self, name: str, *, pid: Optional[int] = None) -> None:
+        self.events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": os.getpid() if pid is None else pid,
+                "args": {"name": name},
+            }
+        )
+
+    def merge(self, other: "Tracer") -> None:
+        self.events += other.events
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+tracer: Optional[Tracer] = None
+"""
+The active `Tracer`, if any.
+"""
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def traced(category: str) -> Callable[[_F], _F]:
+    """
+    Decorator that adds a span, named after the decorated function, for each call whilst `tracer` is set.
+    The span is tagged with the `tags` current when it ends, e.g. the class a `class_from_file` declared.
+    """
+
+    def decorator(function: _F) -> _F:
+        name = function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            active = tracer
+            if active is None:
+                return function(*args, **kwargs)
+            start = now()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                active.span(name, category, start)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def tag(**tags: str) -> None:
+    """
+    Tag the following spans with `tags`, e.g. `module="pyb"`, if `tracer` is set.
+    """
+    if tracer is not None:
+        tracer.tags.update(tags)
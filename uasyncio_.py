@@ -15,12 +15,6 @@ def uasyncio(shed: RST2PyI) -> None:
         name="uasyncio",
         old="asynchronous I/O scheduler for writing concurrent code",
         post_doc=f'''
-from abc import ABC
-from typing import Awaitable, TypeVar, Callable
-from typing import Coroutine, Any, Dict, Iterable, Generic, Final
-
-from uio import AnyReadableBuf
-
 _T: Final = TypeVar("_T")
 # `Coroutine` `_T` is covariant and `Awaitable` `_T` is invariant.
 _C: Final = Coroutine[Any, None, _T] | Awaitable[_T]
@@ -15,11 +15,6 @@ def uctypes(shed: RST2PyI) -> None:
     shed.module(
         name="uctypes",
         old="access binary data in a structured way",
-        post_doc=f"""
-from typing import Final
-
-from uio import AnyReadableBuf
-""",
         end=r"Module contents",
     )
     rst_name = r".. class:: struct(addr, descriptor, layout_type=NATIVE, /)"
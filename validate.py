@@ -0,0 +1,237 @@
+"""
+Validate the written `.pyi` files, e.g. that the `new` signatures in the generators are valid Python,
+see `main.py`'s `--validate` option:
+
+  1. Every file is `ast.parse`d, in parallel.
+  2. If asked, and mypy is installed, the files are type checked with one mypy run (mypy's start up is slow),
+     as the standard library of a custom typeshed (see `_typeshed`), unless some failed to parse.
+
+Each failure is reported with the line of the generator that produced it,
+found by searching the generator's source for the failing line (or the `def` or `class` line it belongs to),
+since the generators' `new` strings are copied verbatim into the `.pyi` files.
+"""
+
+import ast
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import List, Dict, Optional, Tuple, Final
+
+import rst
+from timing import timed, section
+
+__author__ = rst.__author__
+__copyright__ = rst.__copyright__
+__license__ = rst.__license__
+__version__ = "7.5.3"  # Version set by https://github.com/hlovatt/tag2ver
+
+_MYPY_ERROR: Final = re.compile(
+    r"^(?P<path>[^:]+):(?:(?P<line>\d+):)?(?:\d+:)? error: (?P<message>.*)$"
+)
+"""
+An error reported by mypy, `<path>:<line>: error: <message>`; `<path>: error:` if it isn't about a particular line,
+e.g. `mypy: error: ...` if mypy itself fails.
+"""
+@dataclass(frozen=True)
+class Failure:
+    """
+    A failure, `message`, at `line` (1 based, 0 if unknown) of `path` (relative to the output directory),
+    which was produced by `call_site` (`<generator file>:<line>`, or `""` if not found).
+    """
+
+    path: str
+    line: int
+    message: str
+    call_site: str = ""
+
+    def __str__(self) -> str:
+        where = f"{self.path}:{self.line}" if self.line else self.path
+        by = f" (generated by {self.call_site})" if self.call_site else ""
+        return f"{where}: {self.message}{by}"
+
+
+def _parse(path: str) -> Optional[Tuple[int, str]]:
+    """
+    The line and message of the syntax error in `path`, if any.
+    """
+    with open(path) as f:
+        text = f.read()
+    try:
+        ast.parse(text, path)
+    except SyntaxError as e:
+        return e.lineno or 0, e.msg
+    return None
+
+
+def _typeshed(output_root_dir: str, paths: List[str], directory: str) -> Dict[str, str]:
+    """
+    Make `directory` a custom typeshed for mypy: mypy's own, with its modules replaced by the stubs `paths`
+    (relative to `output_root_dir`), since the stubs are MicroPython's standard library, e.g. `sys.pyi`;
+    a stub of a module that is a package in mypy's typeshed, e.g. `collections`, is the package's `__init__.pyi`,
+    so that its submodules, e.g. `collections.abc`, which mypy needs, are kept.
+    Returns the stubs (relative to `output_root_dir`) by their paths relative to `directory`.
+    """
+    spec = find_spec("mypy")
+    assert spec is not None and spec.submodule_search_locations is not None
+    bundled = os.path.join(spec.submodule_search_locations[0], "typeshed")
+    os.symlink(os.path.join(bundled, "stubs"), os.path.join(directory, "stubs"))
+    stdlib = os.path.join(directory, "stdlib")
+    shutil.copytree(
+        os.path.join(bundled, "stdlib"), stdlib, copy_function=os.symlink
+    )
+    versions = os.path.join(stdlib, "VERSIONS")
+    with open(versions) as f:
+        lines = f.read().splitlines(keepends=True)
+    os.remove(versions)  # A link to mypy's own file, don't append to that.
+    known = {line.split(":", 1)[0].strip() for line in lines}
+    stubs = {}
+    for path in paths:
+        target = os.path.join(stdlib, path)
+        top = path.split(os.sep, 1)[0]
+        if os.path.isdir(target[: -len(".pyi")]):
+            target = os.path.join(target[: -len(".pyi")], "__init__.pyi")
+        elif top != path and os.path.lexists(os.path.join(stdlib, top + ".pyi")):
+            os.remove(os.path.join(stdlib, top + ".pyi"))  # Now a package, see `--packages`.
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.lexists(target):
+            os.remove(target)
+        os.symlink(os.path.abspath(os.path.join(output_root_dir, path)), target)
+        stubs[os.path.relpath(target, directory)] = path
+        top = top[: -len(".pyi")] if top.endswith(".pyi") else top
+        if top not in known:
+            lines.append(f"{top}: 3.0-\n")
+            known.add(top)
+    with open(versions, "w") as f:
+        f.writelines(lines)
+    return stubs
+
+
+def _module(path: str) -> str:
+    """
+    The name of the module whose stub is `path`, e.g. `pyb` for `pyb/__init__.pyi` and `pyb._pin` for `pyb/_pin.pyi`.
+    """
+    name = path[: -len(".pyi")].replace(os.sep, ".")
+    return name[: -len(".__init__")] if name.endswith(".__init__") else name
+
+
+def _mypy(output_root_dir: str, paths: List[str]) -> List[Tuple[str, int, str]]:
+    """
+    The errors, path, line, and message, from type checking `paths` (relative to `output_root_dir`) with one mypy run;
+    with the stubs as the standard library (see `_typeshed`), rather than shadowing it, which mypy rejects for `sys`.
+    Errors in mypy's own stubs, e.g. from using MicroPython's `io`, are ignored.
+    An error that isn't about a particular line, e.g. mypy failing to start, has path `""` and line 0.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        stubs = _typeshed(output_root_dir, paths, directory)
+        modules = [_module(path) for path in paths]
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "mypy",
+                "--custom-typeshed-dir",
+                directory,
+                "--no-silence-site-packages",  # Else errors in the typeshed, i.e. the stubs, are hidden.
+                "--no-incremental",
+                "--no-error-summary",
+                *(argument for module in modules for argument in ("-m", module)),
+            ],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+        )
+    errors = []
+    for line in (result.stdout + result.stderr).splitlines():
+        match = _MYPY_ERROR.match(line)
+        if match is None:
+            continue  # E.g. a note.
+        path = stubs.get(os.path.normpath(match["path"]))
+        if path is not None:
+            errors.append((path, int(match["line"] or 0), match["message"]))
+        elif not os.path.normpath(match["path"]).startswith("stdlib" + os.sep):
+            errors.append(("", 0, line))  # Mypy itself failed, not a type error.
+    if result.returncode > 1 and not errors:
+        errors.append(("", 0, (result.stderr or result.stdout).strip()))
+    return errors
+
+
+def call_site(generator_file: str, stub_lines: List[str], line: int) -> str:
+    """
+    The line of `generator_file` that produced `line` (1 based) of a stub, whose lines are `stub_lines`;
+    as `<generator file>:<line>`, or `""` if not found.
+    """
+    if not generator_file or not 0 < line <= len(stub_lines):
+        return ""
+    candidates = [stub_lines[line - 1].strip()]
+    for previous in reversed(stub_lines[: line - 1]):
+        stripped = previous.strip()
+        if stripped.startswith(("def ", "class ")):
+            candidates.append(stripped)
+            break
+    with open(generator_file) as f:
+        source = f.read().splitlines()
+    for candidate in candidates:
+        candidate = candidate.rstrip(":")  # The generators' `new`s don't have the `:`.
+        if len(candidate) < 4:  # E.g. `"""` or `)`, which could be anywhere.
+            continue
+        for number, source_line in enumerate(source, start=1):
+            if candidate in source_line:
+                return f"{os.path.basename(generator_file)}:{number}"
+    return ""
+
+
+@timed("validate")
+def validate(
+    output_root_dir: str,
+    outputs: Dict[str, str],
+    *,
+    jobs: int,
+    mypy: bool,
+) -> List[Failure]:
+    """
+    Validate the `outputs`, files relative to `output_root_dir` to the source file of the generator that wrote them,
+    with `ast.parse` in `jobs` processes and, if `mypy` and it is installed, with mypy.
+    Prints the time taken.
+    """
+    section(module="*", source="validate")
+    start = time.perf_counter()
+    paths = sorted(outputs)
+    full_paths = [os.path.join(output_root_dir, path) for path in paths]
+    if jobs <= 1 or len(paths) <= 1:
+        results = list(map(_parse, full_paths))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_parse, full_paths, chunksize=8))
+    errors = [
+        (path, *result) for path, result in zip(paths, results) if result is not None
+    ]
+    checked = "ast.parse"
+    if mypy:
+        if find_spec("mypy") is None:
+            print("mypy not installed, only validated with `ast.parse`.")
+        elif errors:  # Mypy would stop at the first, already reported.
+            print("Files failed `ast.parse`, not type checked with mypy.")
+        else:
+            checked += " and mypy"
+            in_root = [path for path in paths if not path.startswith(os.pardir)]
+            errors += _mypy(output_root_dir, in_root)
+    failures = []
+    for path, line, message in errors:
+        generator_file = outputs.get(path, "")
+        site = ""
+        if line:
+            with open(os.path.join(output_root_dir, path)) as f:
+                site = call_site(generator_file, f.read().splitlines(), line)
+        failures.append(Failure(path, line, message, site))
+    print(
+        f"Validated {len(paths)} files with {checked} in {time.perf_counter() - start:.2f} s, "
+        f"{len(failures)} failure(s)."
+    )
+    return failures
@@ -15,7 +15,6 @@ def wipy(shed: RST2PyI) -> None:
     shed.module(
         name="wipy",
         old="WiPy specific features",
-        post_doc="from typing import overload",
         end="Functions",
     )
     shed.def_(